@@ -0,0 +1,232 @@
+import collections
+import logging
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from lazy import LazyModule, timed_import
+
+# pyautogui needs a display at import time, so replay runs must never touch it
+pyautogui = LazyModule("pyautogui")
+mss = LazyModule("mss")
+
+logger = logging.getLogger(__name__)
+
+ReplayPoint = collections.namedtuple("Point", "x y")
+
+
+class PyAutoGUIBackend:
+    """Screen and input primitives on the real desktop, via pyautogui."""
+
+    def __init__(self, failsafe=True):
+        pyautogui.FAILSAFE = failsafe
+        self.Point = pyautogui.Point
+        self.errors = (pyautogui.PyAutoGUIException,)
+
+    def size(self):
+        return pyautogui.size()
+
+    def screenshot(self, region=None):
+        return pyautogui.screenshot(region=region)
+
+    def grab(self, region=None, gray=False):
+        """Screenshot as an RGB (or grayscale) NumPy array."""
+        image = self.screenshot(region=region)
+        return np.asarray(image.convert("L" if gray else "RGB"))
+
+    def click(self, *args, **kwargs):
+        pyautogui.click(*args, **kwargs)
+
+    def write(self, text, interval=0.0):
+        pyautogui.write(text, interval=interval)
+
+    def press(self, key):
+        pyautogui.press(key)
+
+    def hotkey(self, *keys):
+        pyautogui.hotkey(*keys)
+
+    def move_to(self, x, y):
+        pyautogui.moveTo(x, y)
+
+    def vscroll(self, clicks):
+        pyautogui.vscroll(clicks)
+
+    def read_clipboard(self):
+        # pyperclip ships with pyautogui
+        return timed_import("pyperclip").paste()
+
+
+class MSSBackend(PyAutoGUIBackend):
+    """
+    pyautogui input with screen capture through mss (XShm on Linux).
+
+    grab() converts straight from mss's BGRA buffer into arrays that are reused
+    for every capture of the same size, so steady-state capture allocates
+    nothing. A returned array is only valid until the next grab() of the same
+    size and mode; copy it to keep it.
+    """
+
+    def __init__(self, failsafe=True):
+        super().__init__(failsafe=failsafe)
+        self.sct = None
+        self.buffers = {}
+
+    def _grab_bgra(self, region):
+        if self.sct is None:
+            self.sct = mss.mss()
+        if region is None:
+            monitor = self.sct.monitors[1]
+        else:
+            left, top, width, height = (int(v) for v in region)
+            monitor = {"left": left, "top": top, "width": width, "height": height}
+        shot = self.sct.grab(monitor)
+        # View onto mss's buffer, no copy
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab(self, region=None, gray=False):
+        bgra = self._grab_bgra(region)
+        channels = 1 if gray else 3
+        key = (bgra.shape[0], bgra.shape[1], channels)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            shape = key[:2] if gray else key
+            buffer = self.buffers[key] = np.empty(shape, dtype=np.uint8)
+        code = cv2.COLOR_BGRA2GRAY if gray else cv2.COLOR_BGRA2RGB
+        return cv2.cvtColor(bgra, code, dst=buffer)
+
+    def screenshot(self, region=None):
+        return Image.fromarray(self.grab(region=region).copy())
+
+
+def create_backend(name="mss", failsafe=True):
+    """Builds the live backend named in config.CAPTURE_BACKEND."""
+    if name == "mss":
+        return MSSBackend(failsafe=failsafe)
+    if name == "pyautogui":
+        return PyAutoGUIBackend(failsafe=failsafe)
+    raise ValueError(f"Unknown capture backend: {name}")
+
+
+class ReplayBackend:
+    """
+    Headless backend that serves recorded or synthetic frames.
+
+    `frames` are full-screen images; clicks, typing and Enter advance to the next one
+    (the last frame repeats). If `page` and `page_rect` are given, screenshots
+    of that region show a window onto the tall `page` image that vscroll()
+    moves by `pixels_per_click`. Input actions are recorded in `actions`, and
+    the clipboard always holds `url`.
+    """
+
+    def __init__(
+        self,
+        frames,
+        page=None,
+        page_rect=None,
+        pixels_per_click=40,
+        url="https://www.linkedin.com/search/results/people/?keywords=replay",
+    ):
+        self.Point = ReplayPoint
+        self.errors = ()
+        self.frames = [frame.convert("RGB") for frame in frames]
+        self.frame_index = 0
+        self.page = page.convert("RGB") if page is not None else None
+        self.page_rect = tuple(page_rect) if page_rect is not None else None
+        self.pixels_per_click = pixels_per_click
+        self.scroll_offset = 0
+        self.url = url
+        self.actions = []
+
+    def _advance(self):
+        self.frame_index = min(self.frame_index + 1, len(self.frames) - 1)
+
+    def size(self):
+        return self.frames[0].size
+
+    def screenshot(self, region=None):
+        if region is not None and self.page is not None and tuple(region) == self.page_rect:
+            _, _, width, height = region
+            top = min(self.scroll_offset, max(0, self.page.height - height))
+            return self.page.crop((0, top, width, top + height))
+        frame = self.frames[self.frame_index]
+        if region is None:
+            return frame.copy()
+        left, top, width, height = region
+        return frame.crop((left, top, left + width, top + height))
+
+    def grab(self, region=None, gray=False):
+        image = self.screenshot(region=region)
+        return np.asarray(image.convert("L" if gray else "RGB"))
+
+    def click(self, *args, **kwargs):
+        self.actions.append(("click", args))
+        self._advance()
+
+    def write(self, text, interval=0.0):
+        self.actions.append(("write", text))
+        self._advance()
+
+    def press(self, key):
+        self.actions.append(("press", key))
+        if key == "enter":
+            self._advance()
+
+    def hotkey(self, *keys):
+        self.actions.append(("hotkey", keys))
+
+    def move_to(self, x, y):
+        self.actions.append(("move_to", (x, y)))
+
+    def vscroll(self, clicks):
+        self.actions.append(("vscroll", clicks))
+        if self.page is None or self.page_rect is None:
+            return
+        max_offset = max(0, self.page.height - self.page_rect[3])
+        self.scroll_offset = min(
+            max(0, self.scroll_offset - clicks * self.pixels_per_click), max_offset
+        )
+
+    def read_clipboard(self):
+        return self.url
+
+
+def synthetic_screen(size, assets, background="white"):
+    """
+    Builds a full-screen frame with `assets` ({path: (left, top)}) pasted in.
+    """
+    frame = Image.new("RGB", size, background)
+    for path, position in assets.items():
+        with Image.open(path) as asset:
+            frame.paste(asset.convert("RGB"), position)
+    return frame
+
+
+def synthetic_results_page(width, cards, connect_asset="assets/connect_button.png", card_height=180):
+    """
+    Builds a tall search-results page of `cards` result cards, each with a
+    Connect button. Returns (page, buttons) where buttons are the centers of
+    the pasted buttons in page coordinates.
+    """
+    with Image.open(connect_asset) as asset:
+        button = asset.convert("RGB")
+    page = Image.new("RGB", (width, cards * card_height + 40), (243, 242, 239))
+    draw = ImageDraw.Draw(page)
+    buttons = []
+    for index in range(cards):
+        top = 20 + index * card_height
+        draw.rectangle((20, top, width - 20, top + card_height - 12), fill="white")
+        # Avatar and a few "text" lines, varied per card so rows are distinguishable
+        draw.ellipse((40, top + 20, 110, top + 90), fill=(120 + index * 7 % 100, 140, 160))
+        for line in range(3):
+            length = 150 + (index * 37 + line * 53) % 250
+            draw.rectangle(
+                (130, top + 25 + line * 22, 130 + length, top + 37 + line * 22),
+                fill=(60 + line * 30, 60, 60),
+            )
+        left = width - 60 - button.width
+        button_top = top + (card_height - 12 - button.height) // 2
+        page.paste(button, (left, button_top))
+        buttons.append({"x": left + button.width // 2, "y": button_top + button.height // 2})
+    return page, buttons
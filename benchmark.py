@@ -0,0 +1,141 @@
+"""
+Headless end-to-end benchmark of the workflow stages.
+
+Runs initial_search -> filter_results -> identify_profiles against a
+ReplayBackend serving a synthetic screen and results page, with StubLLM
+standing in for Gemini, and reports wall time and peak memory per stage.
+
+Usage: python benchmark.py [--cards 10] [--screen 1920x1080] [--llm-latency 0.5]
+"""
+
+import argparse
+import logging
+import os
+import time
+import tracemalloc
+
+from PIL import Image, ImageDraw
+
+from backends import ReplayBackend, synthetic_results_page, synthetic_screen
+from locator import AssetLocator
+from stub_llm import StubLLM
+from tracing import TracedBackend, tracer
+
+STAGES = ("initial_search", "filter_results", "identify_profiles")
+REPLAY_STEPS = 64  # Screens served in turn, one more per click or Enter
+
+
+def layout_assets(screen_size, assets_dir="assets", margin=40):
+    """Places every asset on a simple non-overlapping grid, row by row."""
+    positions = {}
+    left, top, row_height = margin, margin, 0
+    for file_name in sorted(os.listdir(assets_dir)):
+        if not file_name.lower().endswith(".png"):
+            continue
+        path = os.path.join(assets_dir, file_name)
+        with Image.open(path) as image:
+            width, height = image.size
+        if left + width + margin > screen_size[0]:
+            left, top, row_height = margin, top + row_height + margin, 0
+        positions[path] = (left, top)
+        left += width + margin
+        row_height = max(row_height, height)
+    return positions
+
+
+def step_screens(screen_size, steps=REPLAY_STEPS):
+    """
+    Copies of the synthetic screen, one per input step, each with a grey
+    panel in a different column below the assets, so wait_until_ready(before=...)
+    sees every click, typing step or Enter change the page as a real browser would.
+    """
+    screen = synthetic_screen(screen_size, layout_assets(screen_size))
+    width, height = screen_size
+    # A ninth of the width matches a readiness.dhash() cell, so each move flips bits
+    column = width // 9
+    screens = []
+    for step in range(steps):
+        left = column * (1 + step % 7)
+        frame = screen.copy()
+        ImageDraw.Draw(frame).rectangle((left, height // 4, left + column, height), fill="gray")
+        screens.append(frame)
+    return screens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cards", type=int, default=10, help="Result cards on the synthetic page")
+    parser.add_argument("--screen", default="1920x1080", help="Synthetic screen size, WxH")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM base latency (s)")
+    parser.add_argument("--companies", default="Google", help="Comma-separated companies")
+    parser.add_argument("--connections", default="2nd", help="Comma-separated connection levels")
+    parser.add_argument(
+        "--card-index", default=None, help="Card index file; reuse it across runs to measure hits"
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    # Imported here so its logging setup runs before we quiet it down
+    from linkedin_connection_script import Linkedin_Connector, results_region
+
+    logging.getLogger().setLevel(args.log_level)
+
+    screen_size = tuple(int(v) for v in args.screen.lower().split("x"))
+    region = results_region(*screen_size)
+    page, buttons = synthetic_results_page(region[2], args.cards)
+    backend = ReplayBackend(
+        step_screens(screen_size),
+        page=page,
+        page_rect=region,
+    )
+    llm = StubLLM(buttons=buttons[:3], base_latency=args.llm_latency)
+    connector = Linkedin_Connector(
+        search_string="Data Scientist",
+        page_limit=1,
+        companies=[c.strip() for c in args.companies.split(",") if c.strip()],
+        connections=[c.strip() for c in args.connections.split(",") if c.strip()],
+        backend=backend,
+        locator=AssetLocator(TracedBackend(backend), hints_file=None),
+        llm=llm,
+        require_browser=False,
+        checkpoint_path=None,
+        presets_path=None,
+        card_index_path=args.card_index,
+    )
+
+    state = {
+        "search_string": connector.search_string,
+        "page_limit": connector.page_limit,
+        "current_page": connector.current_page,
+        "companies": connector.companies,
+        "connections": connector.connections,
+        "initial_search_status": False,
+        "profiles_to_connect": [],
+    }
+
+    tracemalloc.start()
+    results = []
+    for stage in STAGES:
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        update = getattr(connector, stage)(state)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        state.update(update or {})
+        results.append((stage, elapsed, peak))
+    tracemalloc.stop()
+
+    print(f"Synthetic page: {page.width}x{page.height}, {args.cards} cards, screen {args.screen}")
+    print(f"{'stage':<20} {'seconds':>9} {'peak MB':>9}")
+    for stage, elapsed, peak in results:
+        print(f"{stage:<20} {elapsed:>9.3f} {peak / 1e6:>9.1f}")
+    print(f"{'total':<20} {sum(r[1] for r in results):>9.3f}")
+    print(f"Initial search ok: {state['initial_search_status']}; "
+          f"profiles found: {len(state['profiles_to_connect'])}; "
+          f"LLM calls: {llm.calls}; input actions: {len(backend.actions)}")
+    print()
+    print(tracer.summary_table())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Offline benchmark of LLM tail latency with and without hedged requests, using StubLLM.
+
+A fraction of stub calls is made slow; each run issues the same sequence of
+requests through BudgetedLLM and reports latency percentiles and outcomes.
+
+Usage: python benchmark_llm_budget.py [--requests 200] [--tail-latency 3] [--tail-probability 0.05]
+"""
+
+import argparse
+import logging
+import time
+
+from llm_budget import BudgetedLLM, Deadline, DeadlineExceeded
+from stub_llm import StubLLM
+from tracing import tracer
+from vision import validate_connect_response
+
+logging.basicConfig(level=logging.WARNING)
+
+BUTTONS = [{"x": 100, "y": 50}, {"x": 100, "y": 250}]
+
+
+def run(args, hedge):
+    stub = StubLLM(
+        buttons=BUTTONS,
+        base_latency=args.base_latency,
+        tail_latency=args.tail_latency,
+        tail_probability=args.tail_probability,
+        seed=args.seed,
+    )
+    name = "hedged" if hedge else "plain"
+    llm = BudgetedLLM(
+        stub,
+        name=name,
+        timeout=args.timeout,
+        backoff_base=0.05,
+        hedge=hedge,
+        hedge_min_samples=args.warmup,
+        validate=validate_connect_response,
+    )
+    latencies = []
+    deadline = Deadline(args.budget)
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        try:
+            llm.invoke([], deadline=deadline)
+        except DeadlineExceeded:
+            break
+        latencies.append(time.perf_counter() - start)
+    return name, stub.calls, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--base-latency", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=3.0)
+    parser.add_argument("--tail-probability", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-call timeout (s)")
+    parser.add_argument("--budget", type=float, default=None, help="Total deadline (s)")
+    parser.add_argument("--warmup", type=int, default=20, help="Samples before hedging")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'done':>5} {'calls':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7}")
+    for hedge in (False, True):
+        name, calls, latencies = run(args, hedge)
+        if not latencies:
+            print(f"{name:<8} {0:>5} {calls:>6}")
+            continue
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        print(
+            f"{name:<8} {len(latencies):>5} {calls:>6} {pick(0.5):>7.2f} "
+            f"{pick(0.95):>7.2f} {pick(0.99):>7.2f} {latencies[-1]:>7.2f}"
+        )
+    print()
+    print(tracer.summary_table())
+
+
+if __name__ == "__main__":
+    main()
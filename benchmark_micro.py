@@ -0,0 +1,232 @@
+"""
+Micro-benchmarks of overlap detection, stitching, template matching and encoding.
+
+Every case runs on synthetic, deterministic images (tall results pages and the
+real assets pasted at known positions and scales) at several screen
+resolutions, so it needs no display. Results can be saved as a JSON baseline
+and later runs checked against it; --check exits with status 1 if any case's
+median got slower than the baseline by more than --threshold.
+
+Usage: python benchmark_micro.py [--filter stitch] [--save baseline.json] [--check baseline.json]
+"""
+
+import argparse
+import base64
+import json
+import platform
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from backends import ReplayBackend, synthetic_results_page, synthetic_screen
+from benchmark import layout_assets
+from encoding import LOSSY_QUALITIES, _encode, encode_for_vision
+from locator import AssetLocator
+from screenshot import IncrementalStitcher, find_overlap, row_signature
+from tracing import tracer
+
+RESOLUTIONS = ((1280, 720), (1920, 1080), (2560, 1440))
+ASSET_SCALES = (1.0, 1.25, 1.5)
+PAGE_CARDS = 30
+MISSING_ASSET = "assets/send_button.png"  # Left off the screen for the miss case
+NOISE_FLOOR_MS = 0.5  # Slowdowns smaller than this are never regressions
+
+
+def results_rect(screen_width, screen_height):
+    """Same layout as linkedin_connection_script.results_region()."""
+    return int(screen_width * 0.2), 150, int(screen_width * 0.6), screen_height - 200
+
+
+def page_frames(page, frame_height):
+    """Frames of `page` scrolled by half a frame each, as RGB arrays."""
+    pixels = np.asarray(page)
+    step = frame_height // 2
+    tops = range(0, page.height - frame_height + 1, step)
+    return [pixels[top:top + frame_height] for top in tops]
+
+
+def scaled_screen(size, scale):
+    """Synthetic screen with every asset pasted at `scale`; returns (screen, positions)."""
+    positions = layout_assets(size)
+    screen = synthetic_screen(size, {})
+    boxes = {}
+    for path, (left, top) in positions.items():
+        with Image.open(path) as asset:
+            asset = asset.convert("RGB")
+            if scale != 1.0:
+                asset = asset.resize(
+                    (round(asset.width * scale), round(asset.height * scale)), Image.LANCZOS
+                )
+        left, top = round(left * scale), round(top * scale)
+        if left + asset.width > size[0] or top + asset.height > size[1]:
+            continue  # Layout was computed at 100%; skip assets scaled off screen
+        screen.paste(asset, (left, top))
+        boxes[path] = (left, top)
+    return screen, boxes
+
+
+def build_cases():
+    """Returns [(name, func)] and checks each case gives the right answer once."""
+    cases = []
+    for width, height in RESOLUTIONS:
+        res = f"{width}x{height}"
+        _, _, page_width, frame_height = results_rect(width, height)
+        page, _ = synthetic_results_page(page_width, PAGE_CARDS)
+        frames = page_frames(page, frame_height)
+        signatures = [row_signature(frame) for frame in frames]
+        expected_start = frame_height - frame_height // 2
+
+        def overlap(signatures=signatures, expected_start=expected_start):
+            start = find_overlap(signatures[0], signatures[1])
+            assert start == expected_start, f"overlap found at {start}, expected {expected_start}"
+
+        def stitch(frames=frames, page_width=page_width):
+            stitcher = IncrementalStitcher(page_width)
+            for frame in frames:
+                assert stitcher.add_frame(frame) is not None
+            return stitcher
+
+        covered = frame_height // 2 * (len(frames) - 1) + frame_height
+        stitched = stitch().to_image()
+        assert stitched.height == covered, f"stitched {stitched.height} rows, expected {covered}"
+
+        cases.append((f"row_signature/{res}", lambda frame=frames[0]: row_signature(frame)))
+        cases.append((f"find_overlap/{res}", overlap))
+        cases.append((f"stitch/{res}/{len(frames)}frames", stitch))
+
+        for scale in ASSET_SCALES:
+            screen, boxes = scaled_screen((width, height), scale)
+            locator = AssetLocator(ReplayBackend([screen]), hints_file=None)
+            locator.refresh()
+            for path, (left, top) in boxes.items():
+                box = locator.locate(path)
+                assert box is not None and abs(box[0] - left) <= 2 and abs(box[1] - top) <= 2, (
+                    f"{path} at scale {scale}: found {box}, expected near {(left, top)}"
+                )
+
+            def locate_all(locator=locator, paths=tuple(boxes)):
+                locator.hints = {}  # Full-screen search every round
+                for path in paths:
+                    locator.locate(path)
+
+            def locate_hinted(locator=locator, paths=tuple(boxes)):
+                for path in paths:
+                    locator.locate(path)
+
+            cases.append((f"locate_full/{res}/x{scale}", locate_all))
+            cases.append((f"locate_hinted/{res}/x{scale}", locate_hinted))
+
+        # The miss path: every scale is swept for an asset that isn't on screen,
+        # as when wait_until_ready() polls a page that is still loading
+        screen = synthetic_screen(
+            (width, height),
+            {path: position for path, position in layout_assets((width, height)).items()
+             if path != MISSING_ASSET},
+        )
+        miss_locator = AssetLocator(ReplayBackend([screen]), hints_file=None)
+        miss_locator.refresh()
+        assert miss_locator.locate(MISSING_ASSET) is None, f"{MISSING_ASSET} found on {res}"
+        cases.append(
+            (f"locate_miss/{res}", lambda locator=miss_locator: locator.locate(MISSING_ASSET))
+        )
+
+        content = stitched.crop((0, 0, page_width, min(stitched.height, 4000)))
+        for fmt, quality in (("PNG", None), ("WEBP", LOSSY_QUALITIES[0])):
+            def encode(fmt=fmt, quality=quality, content=content):
+                base64.b64encode(_encode(content, fmt, quality))
+
+            cases.append((f"encode_{fmt.lower()}/{res}", encode))
+        cases.append(
+            (f"encode_for_vision/{res}", lambda content=content: encode_for_vision(content))
+        )
+    return cases
+
+
+def measure(func, rounds, warmup=1):
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "rounds": rounds}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pillow": Image.__version__,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns [(name, baseline_ms, current_ms)] for cases slower than allowed."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        allowed = max(previous["median_ms"] * (1 + threshold), previous["median_ms"] + NOISE_FLOOR_MS)
+        if result["median_ms"] > allowed:
+            regressions.append((name, previous["median_ms"], result["median_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--save", help="Write results to this JSON baseline file")
+    parser.add_argument("--check", help="Compare against this JSON baseline file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown as a fraction of the baseline"
+    )
+    args = parser.parse_args()
+
+    # Measure the code itself, not span bookkeeping
+    tracer.enabled = False
+    cv2.setNumThreads(1)  # Keeps timings comparable across machines and runs
+
+    cases = [case for case in build_cases() if args.filter in case[0]]
+    baseline = None
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'case':<36} {'median ms':>10} {'min ms':>9} {'baseline':>9} {'change':>8}")
+    for name, func in cases:
+        result = results[name] = measure(func, args.rounds)
+        line = f"{name:<36} {result['median_ms']:>10.2f} {result['min_ms']:>9.2f}"
+        previous = baseline and baseline.get("results", {}).get(name)
+        if previous:
+            change = result["median_ms"] / previous["median_ms"] - 1
+            line += f" {previous['median_ms']:>9.2f} {change:>+8.0%}"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nSaved {len(results)} results to '{args.save}'")
+
+    if baseline is not None:
+        if baseline.get("environment") != environment():
+            print(f"\nNote: baseline was recorded with {baseline.get('environment')}")
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Offline benchmark of analyze_page latency versus tile size, using StubLLM.
+
+Usage: python benchmark_tiles.py [image] [--tile-heights 800 1600 3200]
+"""
+
+import argparse
+import logging
+import time
+
+from PIL import Image
+
+from stub_llm import StubLLM
+from vision import TILE_OVERLAP, analyze_page
+
+logging.basicConfig(level=logging.WARNING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default="full_page_screenshot.png")
+    parser.add_argument("--tile-heights", nargs="+", type=int, default=[800, 1600, 3200, 100000])
+    parser.add_argument("--overlap", type=int, default=TILE_OVERLAP)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--base-latency", type=float, default=0.5)
+    parser.add_argument("--seconds-per-mb", type=float, default=2.0)
+    args = parser.parse_args()
+
+    image = Image.open(args.image).convert("RGB")
+    print(f"Image: {args.image} ({image.width}x{image.height})")
+    print(f"{'tile height':>12} {'calls':>6} {'seconds':>8}")
+    for tile_height in args.tile_heights:
+        llm = StubLLM(base_latency=args.base_latency, seconds_per_mb=args.seconds_per_mb)
+        start = time.perf_counter()
+        analyze_page(
+            image, llm, tile_height=tile_height, overlap=args.overlap, max_workers=args.workers
+        )
+        elapsed = time.perf_counter() - start
+        print(f"{tile_height:>12} {llm.calls:>6} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import logging
+import sys
+import time
+
+from config import BROWSER_CHECK_TTL, BROWSER_PROCESS_NAMES
+from lazy import LazyModule
+
+psutil = LazyModule("psutil")
+
+logger = logging.getLogger(__name__)
+
+
+def platform_process_names(platform=None):
+    """Browser process names for `platform` (defaults to sys.platform)."""
+    platform = platform or sys.platform
+    for prefix, names in BROWSER_PROCESS_NAMES.items():
+        if platform.startswith(prefix):
+            return names
+    # Unknown platform: accept any known browser name
+    return [name for names in BROWSER_PROCESS_NAMES.values() for name in names]
+
+
+class BrowserWatcher:
+    """
+    Tracks a running browser by PID.
+
+    The full process table is scanned once to find a browser; afterwards the
+    cached PID is trusted for `ttl` seconds and then re-validated on its own.
+    A new scan only happens once that process is gone.
+    """
+
+    def __init__(self, process_names=None, ttl=BROWSER_CHECK_TTL):
+        names = process_names or platform_process_names()
+        self.process_names = {name.lower() for name in names}
+        self.ttl = ttl
+        self.pid = None
+        self.checked_at = 0.0
+
+    def _matches(self, name):
+        return (name or "").lower() in self.process_names
+
+    def _validate(self, pid):
+        try:
+            process = psutil.Process(pid)
+            # Guard against the PID having been reused by another program
+            return process.is_running() and self._matches(process.name())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def _scan(self):
+        logger.debug("Scanning process table for a browser...")
+        for proc in psutil.process_iter(["name"]):
+            if self._matches(proc.info["name"]):
+                logger.info(f"Browser process '{proc.info['name']}' found (pid {proc.pid}).")
+                return proc.pid
+        return None
+
+    def is_running(self):
+        now = time.monotonic()
+        if self.pid is not None:
+            if now - self.checked_at < self.ttl:
+                return True
+            if self._validate(self.pid):
+                self.checked_at = now
+                return True
+            logger.debug(f"Cached browser pid {self.pid} is gone, rescanning.")
+
+        self.pid = self._scan()
+        self.checked_at = now
+        if self.pid is None:
+            logger.warning("No web browser process found running.")
+            return False
+        return True
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+
+import cv2
+import numpy as np
+
+from locator import to_gray
+from lru_store import SQLiteLRUStore
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = "card_index.sqlite"
+MAX_ENTRIES = 5000
+MAX_AGE = 30 * 24 * 3600  # Seconds
+# dHash grid (columns, rows). Fine enough to tell names and "Connect" from
+# "Pending" apart; a coarse hash would serve one card's buttons for another.
+CARD_HASH_SIZE = (288, 48)
+GRADIENT_THRESHOLD = 8  # Grey levels; smaller differences are treated as flat
+BLANK_TOLERANCE = 6  # Grey levels; a row varying less than this is background
+WHITE_LEVEL = 250  # Grey levels at or above this are the white card background
+DIVIDER_MIN_FRACTION = 0.45  # Share of the width a divider line spans
+MIN_CARD_HEIGHT = 60  # Shorter segments (headers, stray lines) are not cards
+
+
+def longest_run(mask):
+    """(start, end) pixel span of the longest run of True in a row's `same` mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    longest = int(np.argmax(ends - starts))
+    # mask[j] compares pixels j and j + 1, so a run of k Trues spans k + 1 pixels
+    return int(starts[longest]), int(ends[longest]) + 1
+
+
+def split_cards(image):
+    """
+    Splits a stitched results page into (left, top, right, bottom) boxes and
+    returns (cards, leftovers): result cards, and content segments shorter
+    than MIN_CARD_HEIGHT such as headers and the pagination bar.
+
+    Cards are separated by LinkedIn's 1-px divider rows (one grey value across
+    most of the width) or by background rows. Boxes span the white results
+    container the dividers sit in, leaving out the container border and the
+    sidebar, whose content changes with the scroll position.
+    """
+    gray = to_gray(image).astype(np.int16)
+    height, width = gray.shape
+    separator = (gray.max(axis=1) - gray.min(axis=1)) <= BLANK_TOLERANCE
+    same = (gray[:, 1:] == gray[:, :-1]) & (gray[:, 1:] < WHITE_LEVEL)
+    min_run = DIVIDER_MIN_FRACTION * width
+    columns = None
+    for y in np.flatnonzero(same.sum(axis=1) >= min_run):
+        start, end = longest_run(same[y])
+        if end - start < min_run:
+            continue
+        separator[y] = True
+        white = gray[y] >= WHITE_LEVEL
+        if columns is None and (start > 0 and white[start - 1] or end < width and white[end]):
+            # A divider inside the container: widen it to the container's white padding
+            while start > 0 and white[start - 1]:
+                start -= 1
+            while end < width and white[end]:
+                end += 1
+            columns = (start, end)
+    left, right = columns or (0, width)
+
+    cards, leftovers = [], []
+    top = None
+    for y in range(height + 1):
+        if y < height and not separator[y]:
+            if top is None:
+                top = y
+        elif top is not None:
+            (cards if y - top >= MIN_CARD_HEIGHT else leftovers).append((left, top, right, y))
+            top = None
+    return cards, leftovers
+
+
+def card_key(crop):
+    """
+    Perceptual (difference) hash of a card crop, digested and prefixed with
+    its size. The threshold keeps rendering noise in flat areas from
+    flipping bits.
+    """
+    gray = np.asarray(crop.convert("L"))
+    columns, rows = CARD_HASH_SIZE
+    small = cv2.resize(gray, (columns + 1, rows), interpolation=cv2.INTER_AREA).astype(np.int16)
+    gradient = small[:, 1:] - small[:, :-1]
+    bits = np.packbits(np.concatenate([gradient > GRADIENT_THRESHOLD, gradient < -GRADIENT_THRESHOLD]))
+    digest = hashlib.sha1(bits.tobytes()).hexdigest()
+    # A miss only costs an LLM call, while a false hit would click the wrong
+    # thing, so matching errs on the strict side
+    return f"{crop.width}x{crop.height}:{digest}"
+
+
+class CardIndex(SQLiteLRUStore):
+    """
+    Persistent index of result cards already analyzed, mapping each card's
+    perceptual hash to the Connect buttons found in it (relative to the
+    card's top-left corner), with LRU and age-based eviction.
+    """
+
+    def __init__(self, path=INDEX_PATH, max_entries=MAX_ENTRIES, max_age=MAX_AGE):
+        super().__init__(path, "card_index", max_entries, max_age)
+
+    def get(self, key):
+        """Buttons stored for `key`, or None if the card hasn't been seen."""
+        value = super().get(key)
+        return None if value is None else json.loads(value)
+
+    def put_many(self, entries):
+        """Stores {key: buttons}."""
+        super().put_many({key: json.dumps(buttons) for key, buttons in entries.items()})
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+from PIL import Image
+
+from lazy import LazyModule
+
+langgraph_sqlite = LazyModule("langgraph.checkpoint.sqlite")
+
+logger = logging.getLogger(__name__)
+
+
+def default_thread_id(search_string, companies, connections):
+    """Stable thread ID for a set of search parameters, so re-runs resume."""
+    params = json.dumps([search_string, sorted(companies), sorted(connections)])
+    return "run-" + hashlib.sha1(params.encode()).hexdigest()[:12]
+
+
+def open_checkpointer(path):
+    """SQLite-backed LangGraph checkpointer stored at `path`."""
+    connection = sqlite3.connect(path, check_same_thread=False)
+    return langgraph_sqlite.SqliteSaver(connection)
+
+
+class ArtifactStore:
+    """
+    Per-thread directory for artifacts too large for the graph state, such as
+    the stitched screenshot. Paths are deterministic, so a node that crashed
+    halfway can pick up what it already produced.
+    """
+
+    def __init__(self, root, thread_id):
+        self.directory = os.path.join(root, thread_id)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def save_image(self, name, image):
+        """Saves a PIL image or an RGB row array; returns the path."""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name)
+        # Fast compression: this is a resume point, not an archive
+        image.save(path, compress_level=1)
+        logger.debug(f"Saved artifact '{path}'")
+        return path
+
+    def load_image(self, name):
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        logger.info(f"Reusing artifact '{path}'")
+        with Image.open(path) as image:
+            return image.convert("RGB")
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,30 +1,91 @@
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+from lazy import timed_import
 
 
 FAILSAFE = True
 PAGE_LIMIT = 5  # Number of pages to process
+DEBUG_SCREENSHOTS = False  # Also write the stitched screenshot to disk
+LLM_CACHE_PATH = "llm_cache.sqlite"  # Persistent cache of LLM responses
+LLM_CACHE_MAX_ENTRIES = 500
+LLM_CACHE_MAX_AGE = 7 * 24 * 3600  # Seconds before a cached response expires
+CARD_INDEX_PATH = "card_index.sqlite"  # Result cards already analyzed, by perceptual hash
+CARD_INDEX_MAX_ENTRIES = 5000
 API_KEY = "YOUR_API_KEY"  # Replace with your actual API key
 
+LOG_FILE = "log.log"
+LOG_LEVEL = "DEBUG"
+LOG_JSON_LINES = False  # Write the log file as compact JSON lines
+LOG_MAX_BYTES = 10_000_000  # Rotate the log file past this size
+LOG_BACKUP_COUNT = 3
+TRACING_ENABLED = True  # Record spans for nodes and primitives
+TRACE_FILE = "trace.json"  # Chrome trace written at the end of each run
+CAPTURE_BACKEND = "mss"  # "mss" (shared-memory capture) or "pyautogui"
+PRESETS_FILE = "filter_presets.json"  # Saved filtered-results URLs per search
+CHECKPOINT_DB = "checkpoints.sqlite"  # LangGraph checkpoints for resumable runs
+ARTIFACTS_DIR = "artifacts"  # Per-run artifacts such as the stitched screenshot
+CHECKPOINT_MAX_AGE = 6 * 3600  # Seconds; older unfinished runs start over instead of resuming
+
+# Browser process names by sys.platform prefix, used to check a browser is open
+BROWSER_PROCESS_NAMES = {
+    "win32": ["chrome.exe", "firefox.exe", "msedge.exe", "brave.exe", "opera.exe"],
+    "darwin": ["Google Chrome", "firefox", "Microsoft Edge", "Safari", "Brave Browser"],
+    "linux": [
+        "chrome",
+        "google-chrome",
+        "chromium",
+        "chromium-browser",
+        "firefox",
+        "firefox-bin",
+        "firefox-esr",
+        "msedge",
+        "brave",
+        "opera",
+    ],
+}
+BROWSER_CHECK_TTL = 5.0  # Seconds a found browser PID is trusted without re-checking
+
+SMART_MODEL = "gemini-2.5-flash"
+FAST_MODEL = "gemini-2.5-flash-lite-preview-06-17"
+
+# LLM call budgets, see llm_budget.BudgetedLLM
+LLM_CALL_TIMEOUT = 60.0  # Seconds per request before it is abandoned and retried
+LLM_MAX_ATTEMPTS = 3
+LLM_BACKOFF_BASE = 1.0  # Seconds; doubled per retry, with full jitter
+LLM_BACKOFF_MAX = 8.0
+LLM_HEDGE = False  # Send a duplicate request when one is slower than the p95
+LLM_HEDGE_QUANTILE = 0.95
+LLM_HEDGE_MIN_SAMPLES = 20  # Latencies observed before hedging starts
+# Wall-clock budget (seconds) per workflow stage for all of its LLM calls
+STAGE_BUDGETS = {"identify_profiles": 240.0}
+
 if "GOOGLE_API_KEY" not in os.environ:
     os.environ["GOOGLE_API_KEY"] = API_KEY
 
-smart_llm_object = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    response_mime_type="application/json",
-    thinking_budget=4096,
-    verbose=True,
-)
-
-fast_llm_object = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash-lite-preview-06-17",
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    response_mime_type="application/json",
-    thinking_budget=4096,
-    verbose=True,
-)
+
+# Clients are built on first use (see LLMManager) so importing this module
+# doesn't pull in langchain_google_genai or need working credentials.
+def create_smart_llm():
+    genai = timed_import("langchain_google_genai")
+    return genai.ChatGoogleGenerativeAI(
+        model=SMART_MODEL,
+        max_tokens=None,
+        timeout=LLM_CALL_TIMEOUT,
+        max_retries=0,  # Retried by BudgetedLLM, within the stage budget
+        response_mime_type="application/json",
+        thinking_budget=4096,
+        verbose=True,
+    )
+
+
+def create_fast_llm():
+    genai = timed_import("langchain_google_genai")
+    return genai.ChatGoogleGenerativeAI(
+        model=FAST_MODEL,
+        max_tokens=None,
+        timeout=LLM_CALL_TIMEOUT,
+        max_retries=0,  # Retried by BudgetedLLM, within the stage budget
+        response_mime_type="application/json",
+        thinking_budget=4096,
+        verbose=True,
+    )
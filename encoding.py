@@ -0,0 +1,116 @@
+import base64
+import io
+import logging
+import threading
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+MAX_WIDTH = 1024  # Wider payloads are downscaled before upload
+PAYLOAD_BUDGET = 1_500_000  # Bytes; larger encodings fall through to lossy formats
+WEBP_MAX_SIDE = 16383  # Hard limit of the WebP format
+LOSSY_QUALITIES = (85, 70, 55)
+BACKGROUND_TOLERANCE = 2.0  # Column std-dev treated as empty page background
+
+
+class CoordinateTransform(NamedTuple):
+    """Maps coordinates in an encoded payload back to screen space."""
+
+    offset_x: float
+    offset_y: float
+    scale: float
+
+    def to_screen(self, x, y):
+        return (
+            int(round(x / self.scale + self.offset_x)),
+            int(round(y / self.scale + self.offset_y)),
+        )
+
+
+class EncodedImage(NamedTuple):
+    data_url: str
+    mime_type: str
+    size: int
+    transform: CoordinateTransform
+
+
+def content_columns(image):
+    """Returns (left, right) bounds of the columns that aren't plain background."""
+    gray = np.asarray(image.convert("L"), dtype=np.float32)
+    busy = np.flatnonzero(gray.std(axis=0) > BACKGROUND_TOLERANCE)
+    if len(busy) == 0:
+        return 0, image.width
+    return int(busy[0]), int(busy[-1]) + 1
+
+
+def _encode(image, fmt, quality=None):
+    buffer = io.BytesIO()
+    if fmt == "PNG":
+        image.save(buffer, format="PNG", optimize=False)
+    elif fmt == "WEBP":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+@traced("encode_for_vision", "encode")
+def encode_for_vision(image, origin=(0, 0), budget=PAYLOAD_BUDGET):
+    """
+    Crops `image` to its content column, downscales it to MAX_WIDTH and encodes
+    it in memory, picking PNG, WebP or JPEG so the payload fits `budget`.
+
+    `origin` is the screen position of the image's top-left corner; the
+    returned transform maps payload coordinates back to screen space.
+    """
+    image = image.convert("RGB")
+    left, right = content_columns(image)
+    if (left, right) != (0, image.width):
+        image = image.crop((left, 0, right, image.height))
+
+    scale = 1.0
+    if image.width > MAX_WIDTH:
+        scale = MAX_WIDTH / image.width
+        image = image.resize(
+            (MAX_WIDTH, max(1, round(image.height * scale))), Image.LANCZOS
+        )
+
+    candidates = [("PNG", None)]
+    if max(image.size) <= WEBP_MAX_SIDE:
+        candidates += [("WEBP", q) for q in LOSSY_QUALITIES]
+    candidates += [("JPEG", q) for q in LOSSY_QUALITIES]
+
+    for fmt, quality in candidates:
+        payload = _encode(image, fmt, quality)
+        logger.debug(f"Encoded {image.size} as {fmt} (quality={quality}): {len(payload)} bytes")
+        if len(payload) <= budget:
+            break
+    else:
+        logger.warning(f"Payload of {len(payload)} bytes exceeds budget of {budget} bytes.")
+
+    mime_type = f"image/{fmt.lower()}"
+    data_url = f"data:{mime_type};base64,{base64.b64encode(payload).decode('ascii')}"
+    transform = CoordinateTransform(origin[0] + left, origin[1], scale)
+    logger.info(f"Encoded vision payload: {mime_type}, {len(payload)} bytes, scale={scale:.3f}")
+    return EncodedImage(data_url, mime_type, len(payload), transform)
+
+
+def save_debug_image(image, path):
+    """Writes `image` (a PIL image or an RGB row array) to `path` on a background thread."""
+
+    def _save():
+        try:
+            pil_image = Image.fromarray(image) if isinstance(image, np.ndarray) else image
+            pil_image.save(path)
+            logger.debug(f"Saved debug image to '{path}'")
+        except OSError as e:
+            logger.warning(f"Could not save debug image '{path}': {e}")
+
+    thread = threading.Thread(target=_save, name="debug-image-writer", daemon=False)
+    thread.start()
+    return thread
@@ -0,0 +1,125 @@
+import json
+import logging
+import numbers
+
+logger = logging.getLogger(__name__)
+
+ARRAY_KEY = '"connect_buttons"'
+
+
+def validate_button(item):
+    """Returns {"x": int, "y": int} for a well-formed entry, else None."""
+    if not isinstance(item, dict):
+        return None
+    x, y = item.get("x"), item.get("y")
+    for value in (x, y):
+        if isinstance(value, bool) or not isinstance(value, numbers.Real) or value < 0:
+            return None
+    return {"x": int(round(x)), "y": int(round(y))}
+
+
+class ConnectButtonStreamParser:
+    """
+    Incrementally parses the `connect_buttons` array out of a streamed model
+    response, yielding each entry as soon as its closing brace arrives.
+
+    Anything before the array (code fences, other keys) is skipped, and a
+    truncated or malformed tail only loses the entries it contains.
+
+    `closed` is set only by the array's closing bracket; an unexpected token
+    sets `aborted` instead (and counts as rejected). Either stops parsing.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None  # Index just inside the array once it has been found
+        self.closed = False
+        self.aborted = False
+        self.rejected = 0
+        self.decoder = json.JSONDecoder()
+
+    @property
+    def done(self):
+        return self.closed or self.aborted
+
+    def _find_array(self):
+        key = self.buffer.find(ARRAY_KEY)
+        if key < 0:
+            return False
+        bracket = self.buffer.find("[", key + len(ARRAY_KEY))
+        if bracket < 0:
+            return False
+        self.pos = bracket + 1
+        return True
+
+    def _object_end(self, start):
+        """Index just past the `}` matching the `{` at `start`, or None if it hasn't arrived."""
+        depth = 0
+        in_string = escaped = False
+        for index in range(start, len(self.buffer)):
+            char = self.buffer[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+        return None
+
+    def feed(self, chunk):
+        """Adds `chunk` and yields every button that became complete."""
+        if self.done:
+            return
+        self.buffer += chunk
+        if self.pos is None and not self._find_array():
+            return
+
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+            if char in " \t\r\n,":
+                self.pos += 1
+            elif char == "]":
+                self.closed = True
+                return
+            elif char == "{":
+                try:
+                    item, end = self.decoder.raw_decode(self.buffer, self.pos)
+                except json.JSONDecodeError:
+                    end = self._object_end(self.pos)
+                    if end is None:
+                        return  # Object not complete yet
+                    # Its closing brace arrived, so the object is malformed rather
+                    # than incomplete; skip it instead of waiting for a fix
+                    self.rejected += 1
+                    logger.warning(
+                        f"Skipping malformed connect_buttons entry: {self.buffer[self.pos:end]}"
+                    )
+                    self.pos = end
+                    continue
+                self.pos = end
+                button = validate_button(item)
+                if button is None:
+                    self.rejected += 1
+                    logger.warning(f"Skipping malformed connect_buttons entry: {item}")
+                else:
+                    yield button
+            else:
+                # Unexpected token inside the array; nothing after it can be trusted
+                logger.warning(f"Unexpected '{char}' in connect_buttons array, stopping.")
+                self.rejected += 1
+                self.aborted = True
+                return
+
+
+def parse_buttons(text):
+    """Parses a complete (possibly truncated) response with the stream parser."""
+    return list(ConnectButtonStreamParser().feed(text))
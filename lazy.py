@@ -0,0 +1,72 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+START_TIME = time.perf_counter()
+IMPORT_TIMES = {}  # Module name -> seconds spent importing it on first use
+MARKS = []  # (label, seconds since START_TIME)
+
+
+def timed_import(module_name):
+    """Imports `module_name`, recording how long the first import took."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    IMPORT_TIMES[module_name] = time.perf_counter() - start
+    logger.debug(f"Imported '{module_name}' in {IMPORT_TIMES[module_name]:.3f}s")
+    return module
+
+
+class LazyModule:
+    """Module proxy that performs the import on first attribute access."""
+
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = timed_import(self._module_name)
+        return getattr(self._module, attr)
+
+
+class Lazy:
+    """Thread-safe holder that builds its value with `factory` on first get()."""
+
+    def __init__(self, factory, name):
+        self.factory = factory
+        self.name = name
+        self.value = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.value is None:
+            with self.lock:
+                if self.value is None:
+                    start = time.perf_counter()
+                    self.value = self.factory()
+                    IMPORT_TIMES[f"<{self.name}>"] = time.perf_counter() - start
+                    logger.info(f"Constructed {self.name} in {IMPORT_TIMES[f'<{self.name}>']:.3f}s")
+        return self.value
+
+
+def mark(label):
+    """Records a startup milestone, e.g. 'first prompt shown'."""
+    MARKS.append((label, time.perf_counter() - START_TIME))
+
+
+def startup_report():
+    """Logs milestones and the slowest deferred imports/constructions."""
+    lines = ["Startup report:"]
+    for label, elapsed in MARKS:
+        lines.append(f"  {label:<40} {elapsed:8.3f}s")
+    for name, elapsed in sorted(IMPORT_TIMES.items(), key=lambda item: -item[1]):
+        lines.append(f"  import {name:<33} {elapsed:8.3f}s")
+    report = "\n".join(lines)
+    logger.info(report)
+    return report
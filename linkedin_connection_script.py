@@ -1,35 +1,77 @@
-import time
-import random
-import psutil
+from lazy import LazyModule, Lazy, mark, startup_report
 import logging
+import threading
+import time
 from typing import TypedDict, List
-import pyautogui
-from langgraph.graph import StateGraph, END
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.messages import HumanMessage
-from langchain_core.output_parsers import JsonOutputParser
-from config import FAILSAFE, API_KEY, smart_llm_object, fast_llm_object, PAGE_LIMIT
+from config import (
+    FAILSAFE,
+    API_KEY,
+    SMART_MODEL,
+    FAST_MODEL,
+    create_smart_llm,
+    create_fast_llm,
+    PAGE_LIMIT,
+    DEBUG_SCREENSHOTS,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_AGE,
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_JSON_LINES,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    TRACING_ENABLED,
+    TRACE_FILE,
+    CHECKPOINT_DB,
+    ARTIFACTS_DIR,
+    CHECKPOINT_MAX_AGE,
+    CAPTURE_BACKEND,
+    PRESETS_FILE,
+    LLM_CALL_TIMEOUT,
+    LLM_MAX_ATTEMPTS,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_HEDGE,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    STAGE_BUDGETS,
+    CARD_INDEX_PATH,
+    CARD_INDEX_MAX_ENTRIES,
+)
+from log_setup import setup_logging
 from screenshot import scroll_screenshot
-import base64
-import json
-import tkinter as tk
-
-# --- Configuration ---
-
-pyautogui.FAILSAFE = FAILSAFE
-
+from locator import AssetLocator
+from readiness import grab_frame, wait_until_ready
+from encoding import save_debug_image
+from vision import detect_page, validate_connect_response
+from json_stream import ConnectButtonStreamParser
+from local_detector import ConnectButtonDetector
+from llm_cache import ResponseCache, cache_key
+from browser_watch import BrowserWatcher
+from backends import create_backend
+from tracing import tracer, traced, TracedBackend
+from presets import PresetStore
+from checkpoints import ArtifactStore, default_thread_id, open_checkpointer
+from llm_budget import BudgetedLLM, Deadline, DeadlineExceeded
+from card_index import CardIndex
+
+# Heavy modules are imported on first use by the stage that needs them
+tk = LazyModule("tkinter")
+langgraph_graph = LazyModule("langgraph.graph")
+langchain_prompts = LazyModule("langchain_core.prompts")
 
 # --- Logging Setup ---
-# Reset log file at start of each run
-with open("log.log", "w") as f:
-    f.write("")
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("log.log"), logging.StreamHandler()],
+# Previous run's log is rolled over to log.log.1; I/O runs on a listener thread
+setup_logging(
+    LOG_FILE,
+    level=LOG_LEVEL,
+    json_lines=LOG_JSON_LINES,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
 )
 logger = logging.getLogger(__name__)
 logger.info("Logger initialized and log file reset.")
+tracer.enabled = TRACING_ENABLED
 
 
 # --- Helper Functions ---
@@ -78,48 +120,250 @@ def countdown(seconds, message=""):
     root.mainloop()
 
 
+browser_watcher = BrowserWatcher()
+
+
 def is_browser_running():
     """Check if a web browser process is running."""
-    logger.debug("Checking for running browser processes...")
-    browser_processes = ["chrome.exe", "firefox.exe", "msedge.exe", "safari.exe"]
-    for proc in psutil.process_iter(["name"]):
-        logger.debug(f"Examining process: {proc.info['name']}")
-        if proc.info["name"] in browser_processes:
-            logger.info(f"Browser process '{proc.info['name']}' is running.")
-            return True
-    logger.warning("No web browser process found running.")
-    return False
+    return browser_watcher.is_running()
+
+
+def results_region(screen_width, screen_height):
+    """Screen region holding the search results, as (left, top, width, height)."""
+    # Define the region for the screenshot (adjust as needed)
+    # This should be the main content area of the search results
+    return (
+        int(screen_width * 0.2),
+        150,
+        int(screen_width * 0.6),
+        screen_height - 200,
+    )
 
 
 # --- Setting the Global LLm objects ---
 
 
+def message_text(content):
+    """Text of a message or chunk whose content is a string or list of parts."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        part if isinstance(part, str) else part.get("text", "")
+        for part in content
+        if isinstance(part, str) or part.get("type") == "text"
+    )
+
+
 class LLMManager:
-    def __init__(self, smart_flag=False):
+    def __init__(self, smart_flag=False, cache=None):
         logger.info(f"Initializing LLMManager with smart_flag={smart_flag}")
         if smart_flag:
-            logger.debug("Using smart_llm_object.")
-            self.llm = smart_llm_object
+            logger.debug("Using the smart model.")
+            self.model_name = SMART_MODEL
+            self.provider = Lazy(create_smart_llm, "smart_llm")
         else:
-            logger.debug("Using fast_llm_object.")
-            self.llm = fast_llm_object
-
-    def invoke(self, prompt, **kwargs) -> str:
-        logger.info(f"Invoking LLM with prompt and kwargs...")
-        if isinstance(prompt, ChatPromptTemplate):
+            logger.debug("Using the fast model.")
+            self.model_name = FAST_MODEL
+            self.provider = Lazy(create_fast_llm, "fast_llm")
+        self.cache_provider = cache  # Lazy holder of a ResponseCache, or None
+        self.stats = {
+            "calls": 0,
+            "cache_hits": 0,
+            "seconds": 0.0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+        }
+        self.stats_lock = threading.Lock()
+
+    def record(self, seconds=0.0, usage=None, cache_hit=False):
+        """Adds one call's latency and token usage to this model's stats."""
+        usage = usage or {}
+        with self.stats_lock:
+            self.stats["calls"] += 1
+            self.stats["cache_hits"] += int(cache_hit)
+            self.stats["seconds"] += seconds
+            self.stats["input_tokens"] += usage.get("input_tokens", 0)
+            self.stats["output_tokens"] += usage.get("output_tokens", 0)
+
+    @property
+    def llm(self):
+        """The chat client, constructed on first use."""
+        return self.provider.get()
+
+    @property
+    def cache(self):
+        """The response cache, opened on first use."""
+        return None if self.cache_provider is None else self.cache_provider.get()
+
+    def format_messages(self, prompt, **kwargs):
+        if isinstance(prompt, langchain_prompts.ChatPromptTemplate):
             messages = prompt.format_messages(**kwargs)
         else:  # Handle direct message objects for vision
             messages = prompt
-
         logger.debug(f"Formatted messages: {messages}")
+        return messages
+
+    @traced("llm.invoke", "llm")
+    def invoke(self, prompt, **kwargs) -> str:
+        logger.info(f"Invoking LLM with prompt and kwargs...")
+        messages = self.format_messages(prompt, **kwargs)
+
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model_name, messages)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Cache hit, returning cached response: {cached}")
+                self.record(cache_hit=True)
+                return cached
+
+        start = time.perf_counter()
         response = self.llm.invoke(messages)
+        self.record(
+            time.perf_counter() - start, getattr(response, "usage_metadata", None)
+        )
         logger.debug(f"LLM raw response: {response}")
         logger.info(f"Received response: {response.content}")
+        if key is not None:
+            self.cache.put(key, response.content)
         return response.content
 
+    def stream(self, prompt, **kwargs):
+        """Like invoke(), but yields the response text as it arrives."""
+        logger.info("Streaming LLM response...")
+        messages = self.format_messages(prompt, **kwargs)
+
+        key = None
+        if self.cache is not None:
+            key = cache_key(self.model_name, messages)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Cache hit, returning cached response: {cached}")
+                self.record(cache_hit=True)
+                yield cached
+                return
+
+        parts = []
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        start = time.perf_counter()
+        with tracer.span("llm.stream", "llm"):
+            for chunk in self.llm.stream(messages):
+                # Gemini reports token usage per chunk
+                for name, count in (getattr(chunk, "usage_metadata", None) or {}).items():
+                    if name in usage:
+                        usage[name] += count
+                text = message_text(chunk.content)
+                if text:
+                    parts.append(text)
+                    yield text
+        self.record(time.perf_counter() - start, usage)
+        content = "".join(parts)
+        logger.info(f"Received streamed response: {content}")
+        # Reached only if the stream finished; a stream that raised is not cached
+        if key is not None and content:
+            self.cache.put(key, content)
+
+
+# Opened on the first real LLM call, so importing this module (e.g. for an
+# offline replay with a stub LLM) doesn't create the SQLite file
+response_cache = Lazy(
+    lambda: ResponseCache(
+        LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES, max_age=LLM_CACHE_MAX_AGE
+    ),
+    "response_cache",
+)
+smart_llm = LLMManager(smart_flag=True, cache=response_cache)
+fast_llm = LLMManager(smart_flag=False, cache=response_cache)
+
+
+class ModelRouter:
+    """
+    Sends each request to the cheapest tier first and escalates to the next
+    one only when `validate(text, messages)` returns a rejection reason (or
+    the call fails). The last tier's answer is always accepted.
+
+    Answers of tiers that may still be escalated are buffered: validation
+    needs the complete answer, and chunks already yielded can't be taken
+    back. Only the last tier streams, so when the fast tier answers, the
+    first coordinate arrives with its full response. Time to first
+    coordinate is logged and summarized per tier to keep that cost visible.
+    """
+
+    def __init__(self, tiers, validate):
+        self.tiers = tiers
+        self.validate = validate
+        self.requests = 0
+        self.escalations = 0
+        self.first_coordinate = {tier.model_name: [] for tier in tiers}
+        self.lock = threading.Lock()
+
+    def timed(self, tier, chunks):
+        """Passes `chunks` through, recording when the first coordinate completed."""
+        start = time.perf_counter()
+        parser = ConnectButtonStreamParser()
+        found = False
+        for chunk in chunks:
+            if not found and any(True for _ in parser.feed(chunk)):
+                found = True
+                seconds = time.perf_counter() - start
+                logger.info(f"{tier.model_name}: first coordinate after {seconds:.2f}s")
+                with self.lock:
+                    self.first_coordinate[tier.model_name].append(seconds)
+            yield chunk
+
+    def stream(self, prompt, **kwargs):
+        with self.lock:
+            self.requests += 1
+        for tier in self.tiers[:-1]:
+            try:
+                text = "".join(self.timed(tier, tier.stream(prompt, **kwargs)))
+                reason = self.validate(text, tier.format_messages(prompt, **kwargs))
+            except DeadlineExceeded:
+                raise  # No time left for the next tier either
+            except Exception as e:
+                text, reason = None, f"error: {e}"
+            if reason is None:
+                yield text
+                return
+            logger.info(f"{tier.model_name} answer rejected ({reason}), escalating.")
+            with self.lock:
+                self.escalations += 1
+        yield from self.timed(self.tiers[-1], self.tiers[-1].stream(prompt, **kwargs))
 
-smart_llm = LLMManager(smart_flag=True)
-fast_llm = LLMManager(smart_flag=False)
+    def invoke(self, prompt, **kwargs) -> str:
+        return "".join(self.stream(prompt, **kwargs))
+
+    def summary(self):
+        rate = self.escalations / self.requests if self.requests else 0.0
+        tiers = {tier.model_name: dict(tier.stats) for tier in self.tiers}
+        with self.lock:
+            for name, seconds in self.first_coordinate.items():
+                tiers[name]["first_coordinate_s"] = (
+                    sum(seconds) / len(seconds) if seconds else None
+                )
+        return {"requests": self.requests, "escalation_rate": rate, "tiers": tiers}
+
+
+def budgeted(manager):
+    """Wraps an LLMManager with the configured timeouts, retries and hedging."""
+    return BudgetedLLM(
+        manager,
+        name=f"llm.{manager.model_name}",
+        timeout=LLM_CALL_TIMEOUT,
+        max_attempts=LLM_MAX_ATTEMPTS,
+        backoff_base=LLM_BACKOFF_BASE,
+        backoff_max=LLM_BACKOFF_MAX,
+        hedge=LLM_HEDGE,
+        hedge_quantile=LLM_HEDGE_QUANTILE,
+        hedge_min_samples=LLM_HEDGE_MIN_SAMPLES,
+        validate=validate_connect_response,
+    )
+
+
+# Vision requests try the fast model and fall back to the smart one
+vision_llm = ModelRouter(
+    [budgeted(fast_llm), budgeted(smart_llm)], validate_connect_response
+)
 
 
 # --- Setting the State class for workflow ---
@@ -133,6 +377,9 @@ class GraphState(TypedDict):
     companies: List[str]
     connections: List[str]
     profiles_to_connect: List[dict]
+    stitched_image: str
+    preset_restored: bool
+    started_at: float
 
 
 class Linkedin_Connector:
@@ -143,12 +390,42 @@ class Linkedin_Connector:
         companies: List[str],
         connections: List[str],
         current_page: int = 1,
+        backend=None,
+        locator=None,
+        llm=None,
+        require_browser: bool = True,
+        thread_id: str = None,
+        checkpoint_path: str = CHECKPOINT_DB,
+        presets_path: str = PRESETS_FILE,
+        card_index_path: str = CARD_INDEX_PATH,
     ):
         self.search_string = search_string
         self.page_limit = page_limit
         self.current_page = current_page
         self.companies = companies
         self.connections = connections
+        # Screen/input backend and LLM are injectable for offline replay runs
+        self.backend = TracedBackend(
+            backend or create_backend(CAPTURE_BACKEND, failsafe=FAILSAFE)
+        )
+        self.locator = locator or AssetLocator(self.backend)
+        self.llm = llm or vision_llm
+        self.require_browser = require_browser
+        self.detector = ConnectButtonDetector(self.locator.templates["connect_button"])
+        # Runs with the same thread ID resume from the last completed node
+        self.thread_id = thread_id or default_thread_id(
+            search_string, companies, connections
+        )
+        self.checkpoint_path = checkpoint_path
+        self.artifacts = None
+        if checkpoint_path:
+            self.artifacts = ArtifactStore(ARTIFACTS_DIR, self.thread_id)
+        self.presets = PresetStore(presets_path) if presets_path else None
+        self.card_index = (
+            CardIndex(card_index_path, max_entries=CARD_INDEX_MAX_ENTRIES)
+            if card_index_path
+            else None
+        )
         self.workflow = self.create_workflow()
 
     def initial_search(self, state):
@@ -159,15 +436,25 @@ class Linkedin_Connector:
         logger.info(f"Starting initial search for: '{search_string}'")
         logger.debug(f"Initial state: {state}")
 
-        if not is_browser_running():
+        if self.require_browser and not is_browser_running():
             logger.error(
                 "Browser is not running. Please open a browser and log in to LinkedIn."
             )
             return {"initial_search_status": False}
 
         try:
+            if self.presets is not None and self.presets.restore(
+                self.backend,
+                self.locator,
+                search_string,
+                state.get("companies", []),
+                state.get("connections", []),
+            ):
+                return {"initial_search_status": True, "preset_restored": True}
+
             logger.debug("Attempting to locate LinkedIn search bar on screen...")
-            search_bar_location = pyautogui.locateCenterOnScreen(
+            self.locator.refresh()
+            search_bar_location = self.locator.locate_center(
                 "assets/search_bar.png", confidence=0.8
             )
             logger.debug(f"search_bar_location: {search_bar_location}")
@@ -176,105 +463,157 @@ class Linkedin_Connector:
                 return {"initial_search_status": False}
 
             logger.info(f"Found search bar at: {search_bar_location}")
-            pyautogui.click(search_bar_location)
+            self.backend.click(search_bar_location)
             logger.debug("Clicked search bar.")
-            time.sleep(1)
-            pyautogui.hotkey("ctrl", "a")
-            pyautogui.press("delete")
+            tracer.sleep(1)
+            self.backend.hotkey("ctrl", "a")
+            self.backend.press("delete")
             logger.debug("Cleared search bar.")
-            pyautogui.write(search_string, interval=0.2)
+            self.backend.write(search_string, interval=0.2)
             logger.debug(f"Typed search string: {search_string}")
-            pyautogui.press("enter")
+            # The People filter may already be showing from an earlier search
+            before = grab_frame(self.locator)
+            self.backend.press("enter")
             logger.info(
                 f"Typed '{search_string}' into the search bar and pressed Enter."
             )
-            countdown(10, "Waiting for search results to load...")
+            wait_until_ready(
+                self.locator,
+                asset="assets/people_filter.png",
+                timeout=10,
+                message="Waiting for search results to load...",
+                before=before,
+            )
 
             logger.debug("Attempting to locate 'People' filter on screen...")
-            people_filter_location = pyautogui.locateCenterOnScreen(
+            people_filter_location = self.locator.locate_center(
                 "assets/people_filter.png", confidence=0.8
             )
             logger.debug(f"people_filter_location: {people_filter_location}")
             if people_filter_location:
-                pyautogui.click(people_filter_location)
+                before = grab_frame(self.locator)
+                self.backend.click(people_filter_location)
                 logger.info("Clicked the 'People' filter.")
-                countdown(10, "Waiting for filtered results to load...")
+                wait_until_ready(
+                    self.locator,
+                    timeout=10,
+                    message="Waiting for filtered results to load...",
+                    before=before,
+                )
             else:
                 logger.warning("Could not find the 'People' filter button.")
 
             logger.info("Initial search completed.")
             return {"initial_search_status": True}
 
-        except pyautogui.PyAutoGUIException as e:
+        except self.backend.errors as e:
             logger.error(f"A PyAutoGUI error occurred: {e}")
+            self.raise_if_resumable()
             return {"initial_search_status": False}
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
+            self.raise_if_resumable()
             return {"initial_search_status": False}
 
     def filter_results(self, state):
         """
         Applies filters for 'Current company' and connection level.
         """
+        if state.get("preset_restored"):
+            logger.info("Filters already applied by the restored preset.")
+            return state
+
         logger.info("Applying filters...")
         logger.debug(f"Filter state: {state}")
         companies = state.get("companies", [])
         connections = state.get("connections", [])
+        applied_all = True  # Only a fully filtered page is worth saving as a preset
 
         try:
             # --- Apply Company Filters ---
             if companies:
                 logger.debug(f"Companies to filter: {companies}")
-                company_filter_location = pyautogui.locateCenterOnScreen(
+                self.locator.refresh()
+                company_filter_location = self.locator.locate_center(
                     "assets/current_company_filter.png", confidence=0.8
                 )
                 logger.debug(f"company_filter_location: {company_filter_location}")
                 if not company_filter_location:
                     logger.warning("Could not find 'Current company' filter button.")
+                    applied_all = False
                 else:
-                    pyautogui.click(company_filter_location)
+                    before = grab_frame(self.locator)
+                    self.backend.click(company_filter_location)
                     logger.debug("Clicked 'Current company' filter button.")
-                    countdown(4, "Opening company filter...")
+                    wait_until_ready(
+                        self.locator,
+                        asset="assets/add_company_input.png",
+                        timeout=4,
+                        confidence=0.5,
+                        message="Opening company filter...",
+                        before=before,
+                    )
 
-                    add_company_input = pyautogui.locateCenterOnScreen(
+                    add_company_input = self.locator.locate_center(
                         "assets/add_company_input.png", confidence=0.5
                     )
                     logger.debug(f"add_company_input: {add_company_input}")
                     if not add_company_input:
                         logger.warning("Could not find 'Add a company' input field.")
+                        applied_all = False
                     else:
                         for company in companies:
                             logger.info(f"Filtering by company: {company}")
-                            pyautogui.click(add_company_input)
+                            self.backend.click(add_company_input)
                             logger.debug(
                                 f"Clicked 'Add a company' input for: {company}"
                             )
-                            time.sleep(1)
-                            pyautogui.hotkey("ctrl", "a")
-                            pyautogui.press("delete")
+                            tracer.sleep(1)
+                            self.backend.hotkey("ctrl", "a")
+                            self.backend.press("delete")
                             logger.debug("Cleared company input field.")
-                            time.sleep(1)
+                            tracer.sleep(1)
                             logger.debug(f"Typing company name: {company}")
-                            pyautogui.write(company, interval=0.1)
+                            before = grab_frame(self.locator)
+                            self.backend.write(company, interval=0.1)
                             logger.debug(f"Typed company name: {company}")
-                            countdown(5, f"Searching for company '{company}'...")
-                            pyautogui.click(
+                            wait_until_ready(
+                                self.locator,
+                                timeout=5,
+                                message=f"Searching for company '{company}'...",
+                                before=before,
+                            )
+                            before = grab_frame(self.locator)
+                            self.backend.click(
                                 (add_company_input.x, add_company_input.y + 30)
                             )
                             logger.info(f"Added company: {company}")
-                            countdown(5, "Waiting after adding company...")
+                            wait_until_ready(
+                                self.locator,
+                                timeout=5,
+                                message="Waiting after adding company...",
+                                before=before,
+                            )
 
-                    show_results_button = pyautogui.locateCenterOnScreen(
+                    self.locator.refresh()
+                    show_results_button = self.locator.locate_center(
                         "assets/show_results_button.png", confidence=0.8
                     )
                     logger.debug(f"show_results_button: {show_results_button}")
                     if show_results_button:
-                        pyautogui.click(show_results_button)
+                        before = grab_frame(self.locator)
+                        self.backend.click(show_results_button)
                         logger.info("Clicked 'Show results' for company filters.")
-                        countdown(5, "Applying company filters...")
+                        wait_until_ready(
+                            self.locator,
+                            timeout=5,
+                            message="Applying company filters...",
+                            before=before,
+                        )
                     else:
                         logger.warning("Could not find 'Show results' button.")
-                        pyautogui.press("esc")  # Close the dropdown if button not found
+                        applied_all = False
+                        self.backend.press("esc")  # Close the dropdown if button not found
 
             # --- Apply Connection Filters ---
             if connections:
@@ -282,23 +621,38 @@ class Linkedin_Connector:
                 for conn in connections:
                     conn_asset = f"assets/{conn}_connection.png"
                     logger.info(f"Applying connection filter: {conn}")
-                    connection_button = pyautogui.locateCenterOnScreen(
+                    self.locator.refresh()
+                    connection_button = self.locator.locate_center(
                         conn_asset, confidence=0.8
                     )
                     logger.debug(f"connection_button for {conn}: {connection_button}")
                     if connection_button:
-                        pyautogui.click(connection_button)
+                        before = grab_frame(self.locator)
+                        self.backend.click(connection_button)
                         logger.info(f"Clicked '{conn}' connection filter button.")
-                        countdown(5, f"Applying '{conn}' filter...")
+                        wait_until_ready(
+                            self.locator,
+                            timeout=5,
+                            message=f"Applying '{conn}' filter...",
+                            before=before,
+                        )
                     else:
                         logger.warning(
                             f"Could not find '{conn}' connection filter button."
                         )
+                        applied_all = False
+
+            if self.presets is not None and applied_all:
+                self.presets.capture(
+                    self.backend, state["search_string"], companies, connections
+                )
 
-        except pyautogui.PyAutoGUIException as e:
+        except self.backend.errors as e:
             logger.error(f"A PyAutoGUI error occurred during filtering: {e}")
+            self.raise_if_resumable()
         except Exception as e:
             logger.error(f"An unexpected error occurred during filtering: {e}")
+            self.raise_if_resumable()
 
         return state
 
@@ -309,73 +663,60 @@ class Linkedin_Connector:
         logger.info("Identifying profiles to connect with...")
 
         try:
-            # Define the region for the screenshot (adjust as needed)
-            # This should be the main content area of the search results
-            screen_width, screen_height = pyautogui.size()
-            screenshot_rect = (
-                int(screen_width * 0.2),
-                150,
-                int(screen_width * 0.6),
-                screen_height - 200,
-            )
-
-            logger.debug(f"Taking a scrolling screenshot of region: {screenshot_rect}")
-            full_page_image = scroll_screenshot(screenshot_rect)
-
-            # Save the image for debugging
-            full_page_image.save("full_page_screenshot.png")
-            logger.info("Saved full page screenshot to 'full_page_screenshot.png'")
-
-            # Convert image to base64
-            with open("full_page_screenshot.png", "rb") as image_file:
-                image_base64 = base64.b64encode(image_file.read()).decode("utf-8")
-
-            # Prepare the prompt for the vision model
-            prompt = [
-                HumanMessage(
-                    content=[
-                        {
-                            "type": "text",
-                            "text": """
-                        Analyze this screenshot of a LinkedIn search results page.
-                        Identify all the "Connect" buttons for each person listed.
-                        Return a JSON object with a key "connect_buttons" which is a list of dictionaries.
-                        Each dictionary should contain the 'x' and 'y' coordinates of the center of a "Connect" button.
-                        Example: {"connect_buttons": [{"x": 123, "y": 456}, {"x": 123, "y": 789}]}
-                        """,
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": f"data:image/png;base64,{image_base64}",
-                        },
-                    ]
+            screenshot_rect = results_region(*self.backend.size())
+
+            # A resumed run reuses the screenshot captured before the crash
+            full_page_image = None
+            if self.artifacts is not None:
+                full_page_image = self.artifacts.load_image("full_page.png")
+            if full_page_image is None:
+                logger.debug(
+                    f"Taking a scrolling screenshot of region: {screenshot_rect}"
                 )
-            ]
+                full_page_image = scroll_screenshot(screenshot_rect, self.backend)
+                if self.artifacts is not None:
+                    state["stitched_image"] = self.artifacts.save_image(
+                        "full_page.png", full_page_image
+                    )
 
-            logger.info("Sending screenshot to Gemini for analysis...")
-            response_content = smart_llm.invoke(prompt)
+            if DEBUG_SCREENSHOTS:
+                save_debug_image(full_page_image, "full_page_screenshot.png")
 
-            # Clean the response to get valid JSON
-            json_response_str = (
-                response_content.strip().replace("```json", "").replace("```", "")
+            profiles, source = detect_page(
+                full_page_image,
+                self.llm,
+                origin=screenshot_rect[:2],
+                detector=self.detector,
+                card_index=self.card_index,
+                deadline=Deadline(STAGE_BUDGETS.get("identify_profiles")),
             )
-
-            logger.debug(f"Cleaned JSON response string: {json_response_str}")
-
-            response_data = json.loads(json_response_str)
-            profiles = response_data.get("connect_buttons", [])
             logger.info(
-                f"Identified {len(profiles)} potential profiles to connect with."
+                f"Identified {len(profiles)} potential profiles to connect with "
+                f"(answered by: {source})."
             )
+            if response_cache.value is not None:
+                logger.info(f"LLM response cache: {response_cache.value.stats()}")
+            if isinstance(self.llm, ModelRouter):
+                logger.info(f"Model router: {self.llm.summary()}")
 
             state["profiles_to_connect"] = profiles
 
         except Exception as e:
             logger.error(f"An error occurred in identify_profiles: {e}")
+            self.raise_if_resumable()
             state["profiles_to_connect"] = []
 
         return state
 
+    def raise_if_resumable(self):
+        """
+        Re-raises the exception being handled if runs are checkpointed, so the
+        failed node stays pending (and its artifacts kept) for the next run to
+        resume, instead of the graph finishing with an empty result.
+        """
+        if self.checkpoint_path:
+            raise
+
     def should_continue(self, state):
         """
         Determines whether to continue to the next step.
@@ -383,17 +724,17 @@ class Linkedin_Connector:
         if state["initial_search_status"]:
             return "filter_results"
         else:
-            return END
+            return langgraph_graph.END
 
     def create_workflow(self):
         """
         Creates the LangGraph workflow.
         """
-        workflow = StateGraph(GraphState)
+        workflow = langgraph_graph.StateGraph(GraphState)
 
-        workflow.add_node("initial_search", self.initial_search)
-        workflow.add_node("filter_results", self.filter_results)
-        workflow.add_node("identify_profiles", self.identify_profiles)
+        # Each node is wrapped in a tracing span; see tracing.py
+        for name in ("initial_search", "filter_results", "identify_profiles"):
+            workflow.add_node(name, tracer.wrap(getattr(self, name), f"node.{name}", "node"))
 
         workflow.set_entry_point("initial_search")
 
@@ -402,9 +743,12 @@ class Linkedin_Connector:
             self.should_continue,
         )
         workflow.add_edge("filter_results", "identify_profiles")
-        workflow.add_edge("identify_profiles", END)
+        workflow.add_edge("identify_profiles", langgraph_graph.END)
 
-        return workflow.compile()
+        checkpointer = None
+        if self.checkpoint_path:
+            checkpointer = open_checkpointer(self.checkpoint_path)
+        return workflow.compile(checkpointer=checkpointer)
 
     def run_workflow(self):
         """
@@ -418,8 +762,45 @@ class Linkedin_Connector:
             "connections": self.connections,
             "initial_search_status": False,
             "profiles_to_connect": [],
+            "stitched_image": "",
+            "preset_restored": False,
+            "started_at": time.time(),
         }
-        self.workflow.invoke(initial_state)
+        if not self.checkpoint_path:
+            self.workflow.invoke(initial_state)
+        else:
+            config = {"configurable": {"thread_id": self.thread_id}}
+            snapshot = self.workflow.get_state(config)
+            age = time.time() - snapshot.values.get("started_at", 0)
+            if snapshot.next and age <= CHECKPOINT_MAX_AGE:
+                logger.info(
+                    f"Resuming run '{self.thread_id}' at: {', '.join(snapshot.next)}"
+                )
+                resume_from = None
+            else:
+                if snapshot.next:
+                    # The page has moved on since; its screenshot would be stale
+                    logger.info(
+                        f"Run '{self.thread_id}' is {age / 3600:.1f}h old, starting over."
+                    )
+                logger.info(f"Starting new run '{self.thread_id}'.")
+                self.artifacts.clear()
+                resume_from = initial_state
+            try:
+                self.workflow.invoke(resume_from, config)
+            except Exception as e:
+                pending = ", ".join(self.workflow.get_state(config).next)
+                logger.error(
+                    f"Run '{self.thread_id}' failed at {pending}: {e}. "
+                    "Run again with the same parameters to resume."
+                )
+            if not self.workflow.get_state(config).next:
+                # Finished runs are never resumed, so their artifacts are dead weight
+                self.artifacts.clear()
+        tracer.export_chrome_trace(TRACE_FILE)
+        logger.info(f"Span summary:\n{tracer.summary_table()}")
+        mark("workflow finished")
+        startup_report()
 
 
 if __name__ == "__main__":
@@ -428,6 +809,8 @@ if __name__ == "__main__":
         "IMPORTANT: Make sure a browser is running with LinkedIn logged in and visible."
     )
     logger.info("Script started. Awaiting user input.")
+    mark("first prompt shown")
+    startup_report()
 
     search_string = input("\nEnter the search string: ")
     if not search_string.strip():
@@ -0,0 +1,260 @@
+import collections
+import concurrent.futures
+import logging
+import math
+import queue
+import random
+import threading
+import time
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The stage's latency budget ran out before an answer arrived."""
+
+
+class CallTimeout(TimeoutError):
+    """One attempt (including its hedge) got no answer within the call timeout."""
+
+
+class Deadline:
+    """Point in time a stage must finish by; `seconds=None` never expires."""
+
+    def __init__(self, seconds=None):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter, so parallel tiles don't retry in lockstep."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def run_in_thread(func):
+    """
+    Runs `func` on a daemon thread and returns a Future for its result. Daemon,
+    so a hung request abandoned after a timeout can't keep the process alive.
+    """
+    future = concurrent.futures.Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class BudgetedLLM:
+    """
+    Wraps an LLM (LLMManager, StubLLM, ...) with per-call timeouts, retries
+    with jittered backoff and an optional per-call `deadline` for the stage.
+
+    With `hedge=True`, an attempt that hasn't answered after the observed
+    `hedge_quantile` latency gets a duplicate request, and the first answer
+    that passes `validate(text, prompt)` wins. Hedged answers are buffered in
+    full, so stream() then yields the winner as a single chunk; otherwise it
+    passes chunks through as they arrive.
+
+    Outcomes are counted on the tracer as `<name>.ok`, `.timeouts`, `.errors`,
+    `.retries`, `.hedges`, `.hedge_wins`, `.invalid` and `.deadline_exceeded`.
+    """
+
+    def __init__(
+        self,
+        llm,
+        name,
+        timeout=None,
+        max_attempts=3,
+        backoff_base=1.0,
+        backoff_max=8.0,
+        hedge=False,
+        hedge_quantile=0.95,
+        hedge_min_samples=20,
+        validate=None,
+        window=200,
+    ):
+        self.llm = llm
+        self.name = name
+        self.timeout = float("inf") if timeout is None else timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.validate = validate
+        self.latencies = collections.deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def __getattr__(self, attr):
+        # model_name, stats, format_messages, ... of the wrapped LLM
+        return getattr(self.llm, attr)
+
+    def count(self, outcome):
+        tracer.count(f"{self.name}.{outcome}")
+
+    def hedge_delay(self):
+        """Seconds after which to hedge, or None until enough latencies are known."""
+        if not self.hedge:
+            return None
+        with self.lock:
+            samples = sorted(self.latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(self.hedge_quantile * len(samples)))]
+
+    def _attempt(self, prompt, kwargs, timeout):
+        """One request (plus at most one hedge); returns the first valid answer."""
+        start = time.monotonic()
+        request = lambda: "".join(self.llm.stream(prompt, **kwargs))
+        pending = {run_in_thread(request): False}  # Future -> is it the hedge
+        hedge_at = self.hedge_delay()
+        fallback = error = None
+
+        while pending:
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                raise CallTimeout(f"no answer after {timeout:.1f}s")
+            wake = timeout - elapsed
+            if hedge_at is not None:
+                wake = min(wake, max(0.0, hedge_at - elapsed))
+            done, _ = concurrent.futures.wait(
+                pending,
+                timeout=None if math.isinf(wake) else wake,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                is_hedge = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if self.validate is None or self.validate(text, prompt) is None:
+                    self.record(time.monotonic() - start)
+                    if is_hedge:
+                        self.count("hedge_wins")
+                    return text
+                fallback = text if fallback is None else fallback
+
+            if pending and hedge_at is not None and time.monotonic() - start >= hedge_at:
+                logger.info(f"{self.name}: no answer after {hedge_at:.2f}s, hedging.")
+                self.count("hedges")
+                pending[run_in_thread(request)] = True
+                hedge_at = None
+
+        if fallback is not None:
+            # Invalid but complete; the caller (e.g. ModelRouter) decides what to do
+            self.count("invalid")
+            return fallback
+        raise error
+
+    def _stream_attempt(self, prompt, kwargs, deadline):
+        """
+        One request whose chunks are yielded as they arrive. The timeout
+        applies to each wait for the next chunk.
+        """
+        start = time.monotonic()
+        chunks = queue.Queue()
+
+        def pump():
+            try:
+                for chunk in self.llm.stream(prompt, **kwargs):
+                    chunks.put((chunk, None))
+                chunks.put((None, None))
+            except Exception as e:
+                chunks.put((None, e))
+
+        threading.Thread(target=pump, daemon=True).start()
+        while True:
+            wait = min(self.timeout, deadline.remaining())
+            try:
+                chunk, error = chunks.get(timeout=None if math.isinf(wait) else wait)
+            except queue.Empty:
+                raise CallTimeout(f"no chunk after {wait:.1f}s") from None
+            if error is not None:
+                raise error
+            if chunk is None:
+                self.record(time.monotonic() - start)
+                return
+            yield chunk
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def failed(self, attempt, error, deadline):
+        """Counts a failed attempt and sleeps before the next one, if any."""
+        self.count("timeouts" if isinstance(error, CallTimeout) else "errors")
+        logger.warning(f"{self.name} attempt {attempt + 1}/{self.max_attempts} failed: {error}")
+        if attempt + 1 < self.max_attempts:
+            self.count("retries")
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            tracer.sleep(min(delay, deadline.remaining()))
+
+    def give_up(self, error, deadline):
+        if deadline.expired():
+            self.count("deadline_exceeded")
+            raise DeadlineExceeded(f"{self.name}: stage budget exhausted") from error
+        raise error
+
+    def invoke(self, prompt, deadline=None, **kwargs) -> str:
+        deadline = deadline or Deadline()
+        error = None
+        for attempt in range(self.max_attempts):
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                break
+            try:
+                text = self._attempt(prompt, kwargs, min(self.timeout, remaining))
+                self.count("ok")
+                return text
+            except Exception as e:
+                error = e
+            self.failed(attempt, error, deadline)
+        self.give_up(error, deadline)
+
+    def stream(self, prompt, deadline=None, **kwargs):
+        """
+        Yields chunks as they arrive. Only while hedging is active is the
+        answer buffered, since a hedge needs complete answers to compare.
+        """
+        if self.hedge_delay() is not None:
+            yield self.invoke(prompt, deadline=deadline, **kwargs)
+            return
+
+        deadline = deadline or Deadline()
+        error = None
+        for attempt in range(self.max_attempts):
+            if deadline.expired():
+                break
+            started = False
+            try:
+                for chunk in self._stream_attempt(prompt, kwargs, deadline):
+                    started = True
+                    yield chunk
+                self.count("ok")
+                return
+            except Exception as e:
+                if started:
+                    # The caller already has part of this answer; a retry would repeat it
+                    self.count("timeouts" if isinstance(e, CallTimeout) else "errors")
+                    raise
+                error = e
+            self.failed(attempt, error, deadline)
+        self.give_up(error, deadline)
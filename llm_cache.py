@@ -0,0 +1,60 @@
+import base64
+import hashlib
+import io
+import logging
+
+from PIL import Image
+
+from lru_store import SQLiteLRUStore
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = "llm_cache.sqlite"
+MAX_ENTRIES = 500
+MAX_AGE = 7 * 24 * 3600  # Seconds
+
+
+def image_digest(data_url):
+    """
+    Exact digest of a data-URL image's decoded pixels, prefixed with its size.
+
+    Pixels rather than the encoded bytes, so the same screenshot re-encoded
+    with other settings still hits. Exact rather than perceptual: a page where
+    "Connect" turned into "Pending" must miss, or stale coordinates get clicked.
+    """
+    raw = base64.b64decode(data_url.split(",", 1)[1])
+    with Image.open(io.BytesIO(raw)) as image:
+        image = image.convert("RGB")
+    digest = hashlib.sha1(image.tobytes()).hexdigest()
+    return f"{image.width}x{image.height}:{digest}"
+
+
+def cache_key(model, messages):
+    """Content address of a request: model name, prompt text and image digests."""
+    digest = hashlib.sha256(str(model).encode())
+    for message in messages:
+        digest.update(type(message).__name__.encode())
+        content = message.content
+        if isinstance(content, str):
+            digest.update(content.encode())
+            continue
+        for part in content:
+            if isinstance(part, str):
+                digest.update(part.encode())
+            elif part.get("type") == "text":
+                digest.update(part["text"].encode())
+            elif part.get("type") == "image_url":
+                url = part["image_url"]
+                url = url["url"] if isinstance(url, dict) else url
+                if url.startswith("data:"):
+                    digest.update(image_digest(url).encode())
+                else:
+                    digest.update(url.encode())
+    return digest.hexdigest()
+
+
+class ResponseCache(SQLiteLRUStore):
+    """Persistent SQLite cache of LLM responses with size- and age-based eviction."""
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, max_age=MAX_AGE):
+        super().__init__(path, "response_cache", max_entries, max_age)
@@ -0,0 +1,103 @@
+import logging
+from typing import List, NamedTuple
+
+import cv2
+import numpy as np
+
+from lazy import LazyModule
+from locator import to_gray
+from tracing import traced
+
+# OCR and scikit-image are only imported when a page is actually analyzed
+pytesseract = LazyModule("pytesseract")
+skimage_feature = LazyModule("skimage.feature")
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_THRESHOLD = 0.8  # Minimum normalized match score for a button candidate
+OCR_MIN_CONFIDENCE = 60  # Tesseract word confidence (0-100)
+AGREEMENT_DISTANCE = 60  # Max px between a template hit and its OCR "Connect" word
+TEMPLATE_ONLY_CONFIDENCE = 0.5  # Confidence ceiling when OCR is unavailable
+
+
+class DetectionResult(NamedTuple):
+    buttons: List[dict]  # Same schema as the LLM: [{"x": .., "y": ..}] in image coordinates
+    confidence: float
+    source: str
+
+
+class ConnectButtonDetector:
+    """
+    Finds "Connect" buttons locally by matching the connect_button asset and
+    cross-checking the hits against Tesseract OCR of the same image.
+
+    Confidence is the share of buttons on which both methods agree, so pages
+    where they disagree (or OCR isn't installed) can be escalated to the LLM.
+    """
+
+    def __init__(self, template):
+        self.template = to_gray(template)
+
+    def template_hits(self, gray):
+        height, width = self.template.shape
+        if gray.shape[0] < height or gray.shape[1] < width:
+            return []
+        result = cv2.matchTemplate(gray, self.template, cv2.TM_CCOEFF_NORMED)
+        peaks = skimage_feature.peak_local_max(
+            result,
+            min_distance=max(1, min(height, width) // 2),
+            threshold_abs=TEMPLATE_THRESHOLD,
+            exclude_border=False,
+        )
+        return [(int(x) + width // 2, int(y) + height // 2) for y, x in peaks]
+
+    def ocr_hits(self, gray):
+        data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
+        hits = []
+        for i, word in enumerate(data["text"]):
+            if word.strip().lower() != "connect":
+                continue
+            if float(data["conf"][i]) < OCR_MIN_CONFIDENCE:
+                continue
+            hits.append(
+                (
+                    data["left"][i] + data["width"][i] // 2,
+                    data["top"][i] + data["height"][i] // 2,
+                )
+            )
+        return hits
+
+    @traced("local_detector.detect", "locate")
+    def detect(self, image):
+        gray = to_gray(image)
+        template_hits = self.template_hits(gray)
+        try:
+            ocr_hits = self.ocr_hits(gray)
+        # Not pytesseract.TesseractNotFoundError: the lazy lookup itself would
+        # raise if pytesseract is missing. Its errors subclass OSError and
+        # RuntimeError.
+        except (ImportError, OSError, RuntimeError) as e:
+            logger.warning(f"OCR unavailable ({e!r}); using template matches only.")
+            ocr_hits = None
+
+        buttons = [{"x": x, "y": y} for x, y in template_hits]
+        if ocr_hits is None:
+            confidence = TEMPLATE_ONLY_CONFIDENCE if template_hits else 0.0
+        else:
+            agreed = sum(
+                1
+                for x, y in template_hits
+                if any(
+                    abs(x - ox) <= AGREEMENT_DISTANCE and abs(y - oy) <= AGREEMENT_DISTANCE
+                    for ox, oy in ocr_hits
+                )
+            )
+            total = max(len(template_hits), len(ocr_hits))
+            confidence = agreed / total if total else 0.0
+
+        logger.info(
+            f"Local detector: {len(template_hits)} template hits, "
+            f"{'n/a' if ocr_hits is None else len(ocr_hits)} OCR hits, "
+            f"confidence {confidence:.2f}"
+        )
+        return DetectionResult(buttons, confidence, "local")
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = "assets"
+HINTS_FILE = "asset_hints.json"
+# Template scales tried when the display is not at 100% DPI; the scale that
+# last matched is always tried first.
+SCALES = (1.0, 1.25, 1.5, 2.0, 0.75)
+PYRAMID_FACTOR = 0.5  # Downscale factor for the coarse search level
+MIN_COARSE_SIZE = 12  # Smallest template side worth matching at the coarse level
+COARSE_MARGIN = 0.15  # Coarse scores may fall this far below the confidence
+HINT_MARGIN = 80  # Pixels searched around the last known location
+
+
+def asset_key(asset):
+    """Normalizes 'assets/search_bar.png' or 'search_bar' to 'search_bar'."""
+    return os.path.splitext(os.path.basename(asset))[0]
+
+
+def to_gray(image):
+    """Converts a PIL image or RGB(A) array to a grayscale uint8 array."""
+    if isinstance(image, Image.Image):
+        return np.asarray(image.convert("L"))
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
+
+def match_template(haystack, template):
+    """Returns (score, (x, y)) of the best normalized match, or (-1.0, None)."""
+    if haystack.shape[0] < template.shape[0] or haystack.shape[1] < template.shape[1]:
+        return -1.0, None
+    result = cv2.matchTemplate(haystack, template, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def pyramid_match(haystack, template, confidence):
+    """
+    Coarse-to-fine search: match at PYRAMID_FACTOR scale, then refine at full
+    resolution in a small window around the coarse hit.
+
+    A coarse score more than COARSE_MARGIN below `confidence` is a miss
+    without any full-resolution work, which keeps polling for an asset that
+    isn't on screen yet cheap. Only a coarse hit whose refinement misses falls
+    back to a full-resolution match.
+    """
+    height, width = template.shape
+    if min(height, width) * PYRAMID_FACTOR >= MIN_COARSE_SIZE:
+        small_haystack = cv2.resize(
+            haystack, None, fx=PYRAMID_FACTOR, fy=PYRAMID_FACTOR, interpolation=cv2.INTER_AREA
+        )
+        small_template = cv2.resize(
+            template, None, fx=PYRAMID_FACTOR, fy=PYRAMID_FACTOR, interpolation=cv2.INTER_AREA
+        )
+        coarse_score, coarse_loc = match_template(small_haystack, small_template)
+        if coarse_score < confidence - COARSE_MARGIN:
+            return coarse_score, None
+        if coarse_loc is not None:
+            pad = int(2 / PYRAMID_FACTOR) + 2
+            x0 = max(0, int(coarse_loc[0] / PYRAMID_FACTOR) - pad)
+            y0 = max(0, int(coarse_loc[1] / PYRAMID_FACTOR) - pad)
+            window = haystack[y0:y0 + height + 2 * pad, x0:x0 + width + 2 * pad]
+            score, loc = match_template(window, template)
+            if loc is not None and score >= confidence:
+                return score, (loc[0] + x0, loc[1] + y0)
+    return match_template(haystack, template)
+
+
+class AssetLocator:
+    """
+    Finds assets on screen using templates decoded once at startup.
+
+    Call refresh() once per step to grab a shared screenshot, then locate any
+    number of assets against it. Each asset remembers where (and at which
+    scale) it was last found; that region is searched first and persisted in
+    HINTS_FILE between runs.
+    """
+
+    def __init__(self, backend, assets_dir=ASSETS_DIR, hints_file=HINTS_FILE):
+        self.backend = backend
+        self.assets_dir = assets_dir
+        self.hints_file = hints_file
+        self.templates = {}
+        self.scaled_templates = {}
+        self.hints = {}
+        self.haystack = None
+        self.load_assets()
+        self.load_hints()
+
+    def load_assets(self):
+        for file_name in sorted(os.listdir(self.assets_dir)):
+            if not file_name.lower().endswith(".png"):
+                continue
+            path = os.path.join(self.assets_dir, file_name)
+            with Image.open(path) as image:
+                self.templates[asset_key(file_name)] = to_gray(image).copy()
+        logger.info(f"Loaded {len(self.templates)} asset templates from '{self.assets_dir}'.")
+
+    def load_hints(self):
+        if not self.hints_file or not os.path.exists(self.hints_file):
+            return
+        try:
+            with open(self.hints_file) as f:
+                self.hints = json.load(f)
+            logger.debug(f"Loaded search-region hints for {len(self.hints)} assets.")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable hints file '{self.hints_file}': {e}")
+            self.hints = {}
+
+    def save_hints(self):
+        if not self.hints_file:
+            return
+        try:
+            with open(self.hints_file, "w") as f:
+                json.dump(self.hints, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not save hints file '{self.hints_file}': {e}")
+
+    @traced("locator.refresh", "capture")
+    def refresh(self):
+        """Grabs the screenshot shared by all locate calls until the next refresh."""
+        self.haystack = self.backend.grab(gray=True)
+        return self.haystack
+
+    def scaled_template(self, key, scale):
+        cache_key = (key, scale)
+        if cache_key not in self.scaled_templates:
+            template = self.templates[key]
+            if scale == 1.0:
+                scaled = template
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+                scaled = cv2.resize(template, None, fx=scale, fy=scale, interpolation=interpolation)
+            self.scaled_templates[cache_key] = scaled
+        return self.scaled_templates[cache_key]
+
+    def ordered_scales(self, hint):
+        if not hint:
+            return SCALES
+        first = hint["scale"]
+        return (first,) + tuple(s for s in SCALES if s != first)
+
+    def search_hint_region(self, key, hint, confidence):
+        screen_height, screen_width = self.haystack.shape
+        if hint.get("screen") != [screen_width, screen_height]:
+            return None
+        left, top, width, height = hint["box"]
+        x0 = max(0, left - HINT_MARGIN)
+        y0 = max(0, top - HINT_MARGIN)
+        x1 = min(screen_width, left + width + HINT_MARGIN)
+        y1 = min(screen_height, top + height + HINT_MARGIN)
+        region = self.haystack[y0:y1, x0:x1]
+        for scale in self.ordered_scales(hint):
+            template = self.scaled_template(key, scale)
+            score, loc = match_template(region, template)
+            if loc is not None and score >= confidence:
+                logger.debug(f"Hint hit for '{key}' at scale {scale}: {score:.3f}")
+                return scale, (loc[0] + x0, loc[1] + y0) + template.shape[::-1]
+        return None
+
+    def search_full_screen(self, key, hint, confidence):
+        # The learned scale goes first; the others are still swept after it
+        # misses, so a zoom or DPI change is found and re-learned
+        for scale in self.ordered_scales(hint):
+            template = self.scaled_template(key, scale)
+            score, loc = pyramid_match(self.haystack, template, confidence)
+            logger.debug(f"Full-screen match for '{key}' at scale {scale}: {score:.3f}")
+            if loc is not None and score >= confidence:
+                return scale, loc + template.shape[::-1]
+        return None
+
+    @traced("locator.locate", "locate")
+    def locate(self, asset, confidence=0.8):
+        """Returns (left, top, width, height) of the best match, or None."""
+        key = asset_key(asset)
+        if key not in self.templates:
+            logger.error(f"Unknown asset: {asset}")
+            return None
+        if self.haystack is None:
+            self.refresh()
+
+        hint = self.hints.get(key)
+        found = self.search_hint_region(key, hint, confidence) if hint else None
+        if found is None:
+            if hint:
+                logger.debug(f"Hint miss for '{key}', falling back to full-screen search.")
+            found = self.search_full_screen(key, hint, confidence)
+        if found is None:
+            return None
+
+        scale, box = found
+        box = tuple(int(v) for v in box)
+        screen_height, screen_width = self.haystack.shape
+        new_hint = {"box": list(box), "scale": scale, "screen": [screen_width, screen_height]}
+        if hint != new_hint:
+            self.hints[key] = new_hint
+            self.save_hints()
+        return box
+
+    def locate_center(self, asset, confidence=0.8):
+        """Returns the center of the best match as the backend's Point, or None."""
+        box = self.locate(asset, confidence)
+        if box is None:
+            return None
+        left, top, width, height = box
+        return self.backend.Point(left + width // 2, top + height // 2)
@@ -0,0 +1,102 @@
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Data URLs and any other long base64 run (e.g. raw image bytes in a repr)
+DATA_URL_PATTERN = re.compile(r"data:([\w/+.-]+);base64,([A-Za-z0-9+/=]+)")
+BASE64_PATTERN = re.compile(r"[A-Za-z0-9+/]{512,}={0,2}")
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("ascii", "ignore")).hexdigest()[:12]
+
+
+def summarize_payloads(text):
+    """Replaces inline images and long base64 blobs with size/hash summaries."""
+
+    def data_url(match):
+        encoded = match.group(2)
+        return f"<{match.group(1)} {len(encoded) * 3 // 4} bytes sha1={_digest(encoded)}>"
+
+    def blob(match):
+        encoded = match.group(0)
+        return f"<base64 {len(encoded) * 3 // 4} bytes sha1={_digest(encoded)}>"
+
+    text = DATA_URL_PATTERN.sub(data_url, text)
+    return BASE64_PATTERN.sub(blob, text)
+
+
+class PayloadSummaryFilter(logging.Filter):
+    """Formats the record once and strips image payloads from the message."""
+
+    def filter(self, record):
+        message = record.getMessage()
+        if len(message) > 512:
+            record.msg = summarize_payloads(message)
+            record.args = None
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One compact JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(
+    log_file="log.log",
+    level=logging.DEBUG,
+    json_lines=False,
+    max_bytes=10_000_000,
+    backup_count=3,
+):
+    """
+    Routes all logging through a queue so file and console I/O happen on a
+    background listener thread instead of the automation thread.
+
+    The previous run's log is rolled over to `<log_file>.1` at start-up, and
+    the file rotates whenever it grows past `max_bytes`.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    if os.path.getsize(log_file) > 0:
+        file_handler.doRollover()
+    file_handler.setFormatter(
+        JsonLinesFormatter() if json_lines else logging.Formatter(LOG_FORMAT)
+    )
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(PayloadSummaryFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
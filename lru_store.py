@@ -0,0 +1,85 @@
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLRUStore:
+    """
+    Persistent key/value table in SQLite. Least recently used entries are
+    evicted beyond `max_entries`, and entries expire after `max_age` seconds.
+    Tracks hits, misses and evictions.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, path, table, max_entries, max_age):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.connection.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self.connection.execute(
+                f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self.connection.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def put_many(self, entries):
+        """Stores {key: value} in one transaction, then evicts."""
+        now = time.time()
+        with self.lock:
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in entries.items()],
+            )
+            self._evict(now)
+            self.connection.commit()
+
+    def _evict(self, now):
+        expired = self.connection.execute(
+            f"DELETE FROM {self.table} WHERE created < ?", (now - self.max_age,)
+        ).rowcount
+        overflow = self.connection.execute(
+            f"DELETE FROM {self.table} WHERE key NOT IN "
+            f"(SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT ?)",
+            (self.max_entries,),
+        ).rowcount
+        self.evictions += expired + overflow
+
+    def stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import time
+
+from readiness import grab_frame, wait_until_ready
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+RESULTS_URL_PREFIX = "https://www.linkedin.com/search/results/people/"
+# Visible only on a people-search results page, i.e. after the filters loaded
+RESULTS_PAGE_ASSET = "assets/current_company_filter.png"
+
+
+def preset_key(search_string, companies, connections):
+    return json.dumps(
+        [search_string.strip().lower(), sorted(c.lower() for c in companies), sorted(connections)]
+    )
+
+
+def read_current_url(backend):
+    """Copies the address bar through the clipboard and returns it."""
+    backend.hotkey("ctrl", "l")
+    backend.hotkey("ctrl", "c")
+    backend.press("esc")
+    return backend.read_clipboard().strip()
+
+
+def is_results_url(url):
+    return url.startswith(RESULTS_URL_PREFIX)
+
+
+class PresetStore:
+    """
+    Filtered search-results URLs saved per (search string, companies,
+    connections), so later runs can navigate straight to them instead of
+    replaying the search and filter UI.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.presets = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.presets = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable presets file '{path}': {e}")
+
+    def get(self, search_string, companies, connections):
+        return self.presets.get(preset_key(search_string, companies, connections))
+
+    def save(self, search_string, companies, connections, url):
+        self.presets[preset_key(search_string, companies, connections)] = {
+            "url": url,
+            "search_string": search_string,
+            "companies": companies,
+            "connections": connections,
+            "saved_at": time.time(),
+        }
+        if self.write():
+            logger.info(f"Saved filter preset for '{search_string}': {url}")
+
+    def discard(self, search_string, companies, connections):
+        if self.presets.pop(preset_key(search_string, companies, connections), None) is not None:
+            self.write()
+
+    def write(self):
+        """Writes all presets to the file; returns False if it couldn't."""
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self.presets, f, indent=2)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save presets file '{self.path}': {e}")
+            return False
+
+    @traced("presets.capture", "preset")
+    def capture(self, backend, search_string, companies, connections):
+        """Stores the browser's current URL if it is a people-search results page."""
+        url = read_current_url(backend)
+        if is_results_url(url):
+            self.save(search_string, companies, connections, url)
+        else:
+            logger.warning(f"Not saving preset, unexpected URL: {url!r}")
+
+    @traced("presets.restore", "preset")
+    def restore(self, backend, locator, search_string, companies, connections):
+        """
+        Navigates to the saved URL and validates that the filtered results page
+        loaded. Returns False (and forgets the preset) if it didn't, so the
+        caller can fall back to the full UI flow.
+        """
+        preset = self.get(search_string, companies, connections)
+        if preset is None:
+            return False
+
+        logger.info(f"Restoring filter preset: {preset['url']}")
+        # The filter asset may already be on screen from an earlier results
+        # page, so it only counts once the screen has moved on from this frame
+        before = grab_frame(locator)
+        backend.hotkey("ctrl", "l")
+        backend.write(preset["url"])
+        backend.press("enter")
+        result = wait_until_ready(
+            locator,
+            asset=RESULTS_PAGE_ASSET,
+            timeout=10,
+            message="Waiting for preset results to load...",
+            before=before,
+        )
+
+        if result.ready and result.reason == "asset" and is_results_url(read_current_url(backend)):
+            logger.info("Filter preset restored.")
+            return True
+        logger.warning("Filter preset failed validation, falling back to the UI flow.")
+        self.discard(search_string, companies, connections)
+        return False
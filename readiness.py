@@ -0,0 +1,108 @@
+import logging
+import time
+from typing import NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.2  # Seconds between readiness checks
+STABLE_FRAMES = 3  # Consecutive unchanged frames that count as "settled"
+HASH_TOLERANCE = 2  # Max differing hash bits still considered unchanged
+
+
+class ReadyResult(NamedTuple):
+    ready: bool
+    reason: str  # "asset", "stable" or "timeout"
+    waited: float
+
+
+def dhash(gray, hash_size=8):
+    """Difference hash of a grayscale frame as a flat boolean array."""
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return (small[:, 1:] > small[:, :-1]).flatten()
+
+
+def hash_distance(a, b):
+    return int(np.count_nonzero(a != b))
+
+
+def grab_frame(locator, region=None):
+    """Grabs a grayscale frame through the locator, so later locates reuse it."""
+    frame = locator.refresh()
+    if region is not None:
+        left, top, width, height = region
+        frame = frame[top:top + height, left:left + width]
+    return frame
+
+
+@traced("wait_until_ready", "wait")
+def wait_until_ready(
+    locator,
+    asset: Optional[str] = None,
+    region=None,
+    timeout: float = 10.0,
+    confidence: float = 0.8,
+    message: str = "",
+    before=None,
+) -> ReadyResult:
+    """
+    Waits until `asset` is visible or the screen (or `region`) stops changing,
+    whichever comes first, up to `timeout` seconds. "Stops changing" requires
+    that it changed at all; a screen that stays static runs to the timeout.
+
+    `before` is a frame from grab_frame(locator, region) taken before the
+    action being waited on, and counts as the first frame seen. An update
+    that finished before the first poll then still counts as a change, and
+    `asset` only counts once the screen differs from `before`, so an asset
+    still showing on the old page isn't mistaken for the new one. Without it,
+    the change has to happen while polling.
+
+    Replaces fixed countdown() delays: a fast page load returns as soon as it
+    has settled instead of costing the worst-case wait.
+    """
+    logger.info(f"{message} (waiting up to {timeout}s)")
+    start = time.perf_counter()
+    previous_hash = None if before is None else dhash(before)
+    stable_count = 0
+    changed = False
+
+    while True:
+        waited = time.perf_counter() - start
+        frame = grab_frame(locator, region)
+
+        current_hash = dhash(frame)
+        if previous_hash is not None and hash_distance(current_hash, previous_hash) <= HASH_TOLERANCE:
+            stable_count += 1
+        elif previous_hash is not None:
+            stable_count = 0
+            changed = True
+        previous_hash = current_hash
+
+        if asset is not None and (before is None or changed):
+            if locator.locate(asset, confidence) is not None:
+                return _report(ReadyResult(True, "asset", waited), timeout, message)
+
+        # Only settle early once the page has visibly reacted; a screen that
+        # never changed may simply not have started rendering yet.
+        if stable_count >= STABLE_FRAMES and changed:
+            return _report(ReadyResult(True, "stable", waited), timeout, message)
+
+        if waited >= timeout:
+            return _report(ReadyResult(False, "timeout", waited), timeout, message)
+
+        time.sleep(POLL_INTERVAL)
+
+
+def _report(result, timeout, message):
+    saved = max(0.0, timeout - result.waited)
+    if result.ready:
+        logger.info(
+            f"Ready ({result.reason}) after {result.waited:.2f}s, saved {saved:.2f}s: {message}"
+        )
+    else:
+        logger.warning(f"Timed out after {result.waited:.2f}s: {message}")
+    return result
@@ -1,52 +1,216 @@
 import time
 
-import pyautogui
+import numpy as np
 from PIL import Image
 
+from tracing import traced
 
-def __move_mouse2center(screenshot_rect):
-    pyautogui.moveTo(
+SIGNATURE_BANDS = 8  # Column bands averaged into each row signature
+OVERLAP_FRACTION = 4  # Bottom 1/N of the previous frame is matched in the new one
+MAX_OVERLAP_ERROR = 16.0  # Mean squared signature error above which frames don't overlap
+SCROLL_PROBE_UNITS = 1  # First scroll amount, used to measure pixels per unit
+SETTLE_TIMEOUT = 1.0  # Upper bound on waiting for a scroll to finish
+SETTLE_POLL_INTERVAL = 0.05
+SETTLE_TOLERANCE = 0.5  # Mean row-signature change treated as "not moving"
+SCROLL_GRACE = 0.5  # Seconds a busy browser may take to start moving after a scroll
+
+
+def __move_mouse2center(screenshot_rect, backend):
+    backend.move_to(
         screenshot_rect[0] + screenshot_rect[2] / 2.0,
         screenshot_rect[1] + screenshot_rect[3] / 2.0
     )
 
 
-def scroll_screenshot(screenshot_rect):
-    scroll_height = screenshot_rect[3] // 3
-    img_clip = []
-
-    __move_mouse2center(screenshot_rect)
-    screenshot = pyautogui.screenshot(region=screenshot_rect)
-    img_clip.append(screenshot)
-
-    while 1:
-        pyautogui.vscroll(-scroll_height)
-        time.sleep(1.0)
-        new_screenshot = pyautogui.screenshot(region=screenshot_rect)
-        tmp_img = img_clip[-1].crop((
-            0,
-            (img_clip[-1].height // 4) * 3,
-            img_clip[-1].width,
-            img_clip[-1].height
-        ))
-        tmp_pos = pyautogui.locate(tmp_img, new_screenshot)
-        actual_scroll_height = new_screenshot.height - (tmp_pos[1] + tmp_pos[3])
-        if actual_scroll_height == 0:
-            break
-        else:
-            img_clip.append(new_screenshot.crop((
-                0,
-                tmp_pos[1] + tmp_pos[3],
-                new_screenshot.width,
-                new_screenshot.height
-            )))
-            if actual_scroll_height <= (scroll_height // 2.0):
+def row_signature(frame):
+    """Per-row mean brightness of SIGNATURE_BANDS column bands, shape (rows, bands)."""
+    gray = frame.mean(axis=2, dtype=np.float32) if frame.ndim == 3 else frame.astype(np.float32)
+    bands = np.array_split(gray, SIGNATURE_BANDS, axis=1)
+    return np.stack([band.mean(axis=1) for band in bands], axis=1)
+
+
+def find_overlap(prev_signature, new_signature):
+    """
+    Finds where the bottom rows of the previous frame reappear in the new frame
+    using a 1-D cross-correlation of row signatures.
+
+    Returns the row in the new frame where unseen content starts, or None if
+    the frames don't overlap.
+    """
+    tail = prev_signature[-(len(prev_signature) // OVERLAP_FRACTION):]
+    tail_rows = len(tail)
+    if tail_rows == 0 or len(new_signature) < tail_rows:
+        return None
+
+    # Sum of squared differences for every window position, expanded as
+    # sum(w^2) - 2 * sum(w * t) + sum(t^2) so each term is a 1-D correlation.
+    window_energy = np.zeros(len(new_signature) - tail_rows + 1, dtype=np.float64)
+    cross = np.zeros_like(window_energy)
+    for band in range(new_signature.shape[1]):
+        column = new_signature[:, band].astype(np.float64)
+        cumulative = np.concatenate(([0.0], np.cumsum(column ** 2)))
+        window_energy += cumulative[tail_rows:] - cumulative[:-tail_rows]
+        cross += np.correlate(column, tail[:, band].astype(np.float64), mode="valid")
+    template_energy = float(np.sum(tail.astype(np.float64) ** 2))
+    ssd = window_energy - 2.0 * cross + template_energy
+
+    position = int(np.argmin(ssd))
+    if ssd[position] / tail.size > MAX_OVERLAP_ERROR:
+        return None
+    return position + tail_rows
+
+
+class IncrementalStitcher:
+    """
+    Stitches scrolled frames into a growable row buffer, sized to the first
+    frame and doubled as needed.
+
+    Only the row signature of the last frame is kept between calls. The
+    result is handed off as a view of the buffer (pixels()), so consumers
+    copy just the row ranges they crop instead of the whole page.
+    """
+
+    def __init__(self, width, channels=3):
+        self.width = width
+        self.height = 0
+        self.buffer = np.empty((0, width, channels), dtype=np.uint8)
+        self.last_signature = None
+
+    def _reserve(self, rows):
+        needed = self.height + rows
+        if needed <= len(self.buffer):
+            return
+        capacity = max(len(self.buffer), rows)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity,) + self.buffer.shape[1:], dtype=self.buffer.dtype)
+        grown[:self.height] = self.buffer[:self.height]
+        self.buffer = grown
+
+    def _append(self, rows):
+        self._reserve(len(rows))
+        self.buffer[self.height:self.height + len(rows)] = rows
+        self.height += len(rows)
+
+    def add_frame(self, frame):
+        """
+        Appends the unseen rows of `frame` (an HxWx3 array) and returns how many
+        rows were added, or None if it doesn't overlap the previous frame.
+        """
+        signature = row_signature(frame)
+        if self.last_signature is None:
+            self._append(frame)
+            self.last_signature = signature
+            return len(frame)
+
+        start = find_overlap(self.last_signature, signature)
+        if start is None:
+            return None
+        self._append(frame[start:])
+        self.last_signature = signature
+        return len(frame) - start
+
+    def trim(self):
+        """
+        Shrinks the buffer to the stitched rows once no more frames will be
+        added. Resizing in place lets the allocator release the tail without a
+        copy; it raises ValueError if a view of the buffer is still alive.
+        """
+        self.buffer.resize((self.height,) + self.buffer.shape[1:])
+
+    def pixels(self):
+        """The stitched rows as an HxWx3 view of the buffer (no copy)."""
+        return self.buffer[:self.height]
+
+    def to_image(self):
+        return Image.fromarray(self.pixels())
+
+
+def grab_frame(screenshot_rect, backend):
+    return backend.grab(region=screenshot_rect)
+
+
+def signatures_match(a, b):
+    return a.shape == b.shape and np.mean(np.abs(a - b)) <= SETTLE_TOLERANCE
+
+
+def wait_for_settle(screenshot_rect, backend, timeout=SETTLE_TIMEOUT, before=None):
+    """
+    Grabs frames until two consecutive ones have matching row signatures
+    (the page stopped moving) or `timeout` expires, and returns the last one.
+
+    `before` is the signature of the frame before a scroll. A page that still
+    matches it may simply not have started moving yet, so it only counts as
+    settled after SCROLL_GRACE.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    frame = grab_frame(screenshot_rect, backend)
+    signature = row_signature(frame)
+    while time.perf_counter() < deadline:
+        time.sleep(SETTLE_POLL_INTERVAL)
+        next_frame = grab_frame(screenshot_rect, backend)
+        next_signature = row_signature(next_frame)
+        if signatures_match(next_signature, signature) and (
+            before is None
+            or not signatures_match(next_signature, before)
+            or time.perf_counter() - start >= SCROLL_GRACE
+        ):
+            return next_frame
+        frame, signature = next_frame, next_signature
+    return frame
+
+
+@traced("scroll_stitch", "capture")
+def scroll_stitch(screenshot_rect, backend):
+    """
+    Scrolls through the region and stitches it into an IncrementalStitcher.
+
+    The scroll amount passed to vscroll() means different things per platform,
+    so the driver starts with a small probe, measures how many pixels the page
+    actually moved per unit and sizes later steps to move about half a frame.
+    """
+    target_pixels = screenshot_rect[3] // 2
+    units = SCROLL_PROBE_UNITS
+    pixels_per_unit = None
+    stitcher = IncrementalStitcher(screenshot_rect[2])
+
+    __move_mouse2center(screenshot_rect, backend)
+    stitcher.add_frame(wait_for_settle(screenshot_rect, backend))
+
+    while units <= screenshot_rect[3]:
+        backend.vscroll(-units)
+        frame = wait_for_settle(screenshot_rect, backend, before=stitcher.last_signature)
+        moved = stitcher.add_frame(frame)
+        if moved == 0:
+            # Look once more before concluding the page didn't move
+            moved = stitcher.add_frame(wait_for_settle(screenshot_rect, backend))
+
+        if moved is None:
+            if units == 1:
                 break
+            # Scrolled past the overlap window: undo and retry with a smaller step.
+            backend.vscroll(units)
+            wait_for_settle(screenshot_rect, backend, before=row_signature(frame))
+            units = max(1, units // 2)
+            pixels_per_unit = None
+            continue
+        if moved == 0:
+            if pixels_per_unit is not None:
+                break  # Row signature unchanged after a known-good step: end of page.
+            units *= 4  # Probe too small to move the page; try a bigger one.
+            continue
+
+        expected = pixels_per_unit * units if pixels_per_unit else None
+        pixels_per_unit = moved / units
+        if expected and moved <= expected / 2.0:
+            break  # Moved less than half a step: hit the bottom of the page.
+        units = max(1, round(target_pixels / pixels_per_unit))
+
+    stitcher.trim()
+    return stitcher
+
 
-    total_height = sum(img.height for img in img_clip)
-    final_image = Image.new("RGB", (screenshot_rect[2], total_height))
-    y_offset = 0
-    for img in img_clip:
-        final_image.paste(img, (0, y_offset))
-        y_offset += img.height
-    return final_image
\ No newline at end of file
+def scroll_screenshot(screenshot_rect, backend):
+    """Stitched screenshot of the region as an RGB row array; see IncrementalStitcher.pixels()."""
+    return scroll_stitch(screenshot_rect, backend).pixels()
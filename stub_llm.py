@@ -0,0 +1,75 @@
+import base64
+import json
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def image_payload_size(messages):
+    """Total decoded bytes of all data-URL images in `messages`."""
+    size = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, list) else []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                url = part["image_url"]
+                url = url["url"] if isinstance(url, dict) else url
+                if url.startswith("data:"):
+                    size += len(base64.b64decode(url.split(",", 1)[1]))
+    return size
+
+
+class StubLLM:
+    """
+    Offline stand-in for LLMManager that returns canned `connect_buttons` JSON.
+
+    Latency is simulated as `base_latency` plus `seconds_per_mb` of image
+    payload, so tiling and encoding choices can be benchmarked without Gemini.
+    `responder`, if given, is called with the messages and returns the
+    list of buttons to answer with.
+
+    To exercise timeouts and hedging, a fraction `tail_probability` of calls
+    takes an extra `tail_latency` seconds (drawn from a `seed`ed generator).
+    """
+
+    def __init__(
+        self,
+        buttons=None,
+        responder=None,
+        base_latency=0.5,
+        seconds_per_mb=2.0,
+        tail_latency=0.0,
+        tail_probability=0.0,
+        seed=None,
+    ):
+        self.buttons = buttons or []
+        self.responder = responder
+        self.base_latency = base_latency
+        self.seconds_per_mb = seconds_per_mb
+        self.tail_latency = tail_latency
+        self.tail_probability = tail_probability
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs) -> str:
+        return "".join(self.stream(prompt, **kwargs))
+
+    def stream(self, prompt, **kwargs):
+        """Yields the response one entry at a time, spreading half the latency over them."""
+        self.calls += 1
+        payload_mb = image_payload_size(prompt) / 1_000_000
+        latency = self.base_latency + self.seconds_per_mb * payload_mb
+        if self.random.random() < self.tail_probability:
+            latency += self.tail_latency
+        buttons = self.responder(prompt) if self.responder else self.buttons
+        logger.debug(f"Stub LLM call {self.calls} ({payload_mb:.2f} MB): {buttons}")
+
+        time.sleep(latency / 2)
+        parts = ['```json\n{"connect_buttons": [']
+        parts += [("," if i else "") + json.dumps(b) for i, b in enumerate(buttons)]
+        parts += ["]}\n```"]
+        for part in parts:
+            yield part
+            time.sleep(latency / 2 / len(parts))
@@ -0,0 +1,173 @@
+import bisect
+import collections
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+MAX_EVENTS = 100_000  # Oldest trace events are dropped beyond this
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class SpanStats:
+    __slots__ = ("category", "count", "total", "max", "buckets")
+
+    def __init__(self, category):
+        self.category = category
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket containing the given percentile."""
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if index < len(BUCKETS_MS):
+                    return min(BUCKETS_MS[index], self.max * 1000)
+                return self.max * 1000
+        return self.max * 1000
+
+
+class Tracer:
+    """
+    Records spans as Chrome trace events plus per-name counts and latency
+    histograms. A span costs two clock reads and one append, so it can stay on.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.start_ns = time.perf_counter_ns()
+        self.events = collections.deque(maxlen=MAX_EVENTS)
+        self.stats = {}
+        self.counters = collections.Counter()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category="app"):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self.events.append((name, category, start, end, threading.get_ident()))
+            with self.lock:
+                stats = self.stats.get(name)
+                if stats is None:
+                    stats = self.stats[name] = SpanStats(category)
+                stats.add((end - start) / 1e9)
+
+    def count(self, name, amount=1):
+        """Increments the outcome counter `name` (timeouts, retries, ...)."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] += amount
+
+    def sleep(self, seconds):
+        """time.sleep() recorded as a 'sleep' span, so fixed delays show up in traces."""
+        with self.span("sleep", "wait"):
+            time.sleep(seconds)
+
+    def wrap(self, func, name, category="app"):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def export_chrome_trace(self, path):
+        """Writes events in Chrome trace format (open in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        trace_events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.start_ns) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, category, start, end, tid in list(self.events)
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Wrote {len(trace_events)} trace events to '{path}'")
+
+    def summary_table(self):
+        lines = [
+            f"{'span':<32} {'category':<10} {'count':>6} {'total s':>9} "
+            f"{'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9}"
+        ]
+        with self.lock:
+            items = sorted(self.stats.items(), key=lambda item: -item[1].total)
+            for name, stats in items:
+                lines.append(
+                    f"{name:<32} {stats.category:<10} {stats.count:>6} {stats.total:>9.3f} "
+                    f"{stats.total / stats.count * 1000:>9.1f} {stats.percentile(0.5):>8.0f} "
+                    f"{stats.percentile(0.95):>8.0f} {stats.max * 1000:>9.1f}"
+                )
+            if self.counters:
+                lines.append("")
+                lines.append(f"{'counter':<32} {'count':>6}")
+                for name, count in sorted(self.counters.items()):
+                    lines.append(f"{name:<32} {count:>6}")
+        return "\n".join(lines)
+
+
+tracer = Tracer()
+
+
+def traced(name, category="app"):
+    """Decorator recording each call as a span on the global tracer."""
+
+    def decorator(func):
+        return tracer.wrap(func, name, category)
+
+    return decorator
+
+
+class TracedBackend:
+    """Wraps a screen/input backend so every primitive call becomes a span."""
+
+    TRACED_METHODS = (
+        "screenshot",
+        "grab",
+        "click",
+        "write",
+        "press",
+        "hotkey",
+        "move_to",
+        "vscroll",
+        "read_clipboard",
+    )
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __getattr__(self, attr):
+        value = getattr(self.backend, attr)
+        if attr in self.TRACED_METHODS:
+            category = "capture" if attr in ("screenshot", "grab") else "input"
+            return tracer.wrap(value, f"backend.{attr}", category)
+        return value
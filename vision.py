@@ -0,0 +1,349 @@
+import base64
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from card_index import card_key, split_cards
+from encoding import encode_for_vision
+from json_stream import ConnectButtonStreamParser, parse_buttons
+from lazy import LazyModule
+
+langchain_messages = LazyModule("langchain_core.messages")
+
+logger = logging.getLogger(__name__)
+
+TILE_HEIGHT = 1600  # Stitched-image rows per tile
+TILE_OVERLAP = 200  # Must exceed the height of a result card's Connect button
+MAX_CONCURRENT_TILES = 4
+MERGE_DISTANCE = 20  # Detections closer than this (px) are the same button
+LOCAL_CONFIDENCE_THRESHOLD = 0.9  # Below this the local detector escalates to the LLM
+MIN_BUTTON_SPACING = 30  # Payload px; closer answers are duplicates, not two buttons
+MIN_CARD_HEIGHT = 80  # Payload px; bounds how many buttons an image can plausibly hold
+CARD_GAP = 16  # Blank rows between the unseen cards stacked for the LLM
+
+VISION_PROMPT = """
+                        Analyze this screenshot of a LinkedIn search results page.
+                        Identify all the "Connect" buttons for each person listed.
+                        Return a JSON object with a key "connect_buttons" which is a list of dictionaries.
+                        Each dictionary should contain the 'x' and 'y' coordinates of the center of a "Connect" button.
+                        Example: {"connect_buttons": [{"x": 123, "y": 456}, {"x": 123, "y": 789}]}
+                        """
+
+
+def build_vision_prompt(data_url):
+    return [
+        langchain_messages.HumanMessage(
+            content=[
+                {"type": "text", "text": VISION_PROMPT},
+                {"type": "image_url", "image_url": data_url},
+            ]
+        )
+    ]
+
+
+def parse_connect_buttons(response_content):
+    """
+    Parses the model's JSON answer into a list of {"x", "y"} dicts. Code
+    fences are skipped and a malformed tail keeps the entries before it.
+    """
+    return parse_buttons(response_content)
+
+
+def stream_connect_buttons(llm, prompt, parser=None, **kwargs):
+    """
+    Yields validated buttons from a streamed response as each one completes.
+    Pass a ConnectButtonStreamParser as `parser` to check afterwards whether
+    the array was closed.
+    """
+    parser = parser or ConnectButtonStreamParser()
+    start = time.perf_counter()
+    first = True
+    for chunk in llm.stream(prompt, **kwargs):
+        for button in parser.feed(chunk):
+            if first:
+                logger.info(f"First coordinate after {time.perf_counter() - start:.2f}s")
+                first = False
+            yield button
+    if not parser.closed:
+        logger.warning("Response ended before the connect_buttons array was closed.")
+
+
+def payload_image_size(messages):
+    """(width, height) of the first data-URL image in `messages`, or None."""
+    for message in messages:
+        content = message.content if isinstance(message.content, list) else []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                url = part["image_url"]
+                url = url["url"] if isinstance(url, dict) else url
+                if url.startswith("data:"):
+                    # The header is enough for the size; skip decoding the whole payload
+                    prefix = url.split(",", 1)[1][:65536]
+                    with Image.open(io.BytesIO(base64.b64decode(prefix))) as image:
+                        return image.size
+    return None
+
+
+def validate_connect_response(text, messages):
+    """
+    Returns None if `text` is a plausible connect_buttons answer for the image
+    in `messages`, otherwise a short reason. Used to decide when a cheaper
+    model's answer must be escalated.
+    """
+    parser = ConnectButtonStreamParser()
+    buttons = list(parser.feed(text))
+    if not parser.closed:
+        return "incomplete connect_buttons array"
+    if parser.rejected:
+        return f"{parser.rejected} malformed entries"
+    # A closed, empty array is a valid answer: a page of Pending and Message
+    # buttons has nothing to connect to
+
+    size = payload_image_size(messages)
+    if size is not None:
+        width, height = size
+        if any(b["x"] > width or b["y"] > height for b in buttons):
+            return "coordinates outside the image"
+        if len(buttons) > height // MIN_CARD_HEIGHT + 1:
+            return "more buttons than result cards fit"
+
+    ordered = sorted(buttons, key=lambda b: b["y"])
+    for previous, current in zip(ordered, ordered[1:]):
+        if (
+            current["y"] - previous["y"] < MIN_BUTTON_SPACING
+            and abs(current["x"] - previous["x"]) < MIN_BUTTON_SPACING
+        ):
+            return "duplicate buttons"
+    return None
+
+
+def page_size(image):
+    """(width, height) of a PIL image or an RGB row array."""
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def crop_rows(image, box):
+    """
+    Crops `box` (left, top, right, bottom) out of a PIL image or an RGB row
+    array such as IncrementalStitcher.pixels(). An array is sliced, so only
+    the cropped rows are copied into the returned PIL image.
+    """
+    if isinstance(image, np.ndarray):
+        left, top, right, bottom = box
+        return Image.fromarray(np.ascontiguousarray(image[top:bottom, left:right]))
+    return image.crop(box)
+
+
+def split_tiles(height, tile_height=TILE_HEIGHT, overlap=TILE_OVERLAP):
+    """Returns (top, bottom) row ranges of overlapping tiles covering `height`."""
+    if height <= tile_height:
+        return [(0, height)]
+    step = tile_height - overlap
+    tiles = []
+    top = 0
+    while True:
+        bottom = min(top + tile_height, height)
+        tiles.append((top, bottom))
+        if bottom == height:
+            return tiles
+        top += step
+
+
+def merge_buttons(buttons, distance=MERGE_DISTANCE):
+    """Collapses detections within `distance` px of each other, sorted top to bottom."""
+    merged = []
+    for button in sorted(buttons, key=lambda b: (b["y"], b["x"])):
+        for kept in merged:
+            if abs(kept["x"] - button["x"]) <= distance and abs(kept["y"] - button["y"]) <= distance:
+                break
+        else:
+            merged.append(button)
+    return merged
+
+
+def analyze_image(image, llm, origin=(0, 0), deadline=None, parser=None):
+    """
+    Sends a single image to `llm` and returns Connect buttons in screen space.
+    `deadline` (an llm_budget.Deadline) is passed through to the LLM call, and
+    `parser` is used to parse the answer (see stream_connect_buttons).
+    """
+    encoded = encode_for_vision(image, origin=origin)
+    prompt = build_vision_prompt(encoded.data_url)
+    kwargs = {"deadline": deadline} if deadline is not None else {}
+    parser = parser or ConnectButtonStreamParser()
+    if hasattr(llm, "stream"):
+        raw_buttons = stream_connect_buttons(llm, prompt, parser=parser, **kwargs)
+    else:
+        raw_buttons = parser.feed(llm.invoke(prompt, **kwargs))
+    buttons = []
+    for button in raw_buttons:
+        x, y = encoded.transform.to_screen(button["x"], button["y"])
+        buttons.append({"x": x, "y": y})
+    return buttons
+
+
+def analyze_page(
+    image,
+    llm,
+    origin=(0, 0),
+    tile_height=TILE_HEIGHT,
+    overlap=TILE_OVERLAP,
+    max_workers=MAX_CONCURRENT_TILES,
+    deadline=None,
+    parsers=None,
+):
+    """
+    Splits a stitched page into overlapping tiles, analyzes them concurrently
+    and merges the Connect buttons into one list in screen space. If
+    `parsers` is a list, each tile's parser is appended to it, so callers can
+    check that every answer was complete.
+
+    Each tile only keeps detections from its core rows (half of the overlap is
+    trimmed at inner edges), so a button cut by one tile edge is taken from the
+    neighbouring tile where it is whole.
+    """
+    width, height = page_size(image)
+    tiles = split_tiles(height, tile_height, overlap)
+    logger.info(f"Analyzing {len(tiles)} tile(s) of up to {tile_height} rows.")
+    trim = overlap // 2
+
+    def analyze_tile(index, top, bottom):
+        tile = crop_rows(image, (0, top, width, bottom))
+        parser = ConnectButtonStreamParser()
+        if parsers is not None:
+            parsers.append(parser)
+        buttons = analyze_image(
+            tile, llm, origin=(origin[0], origin[1] + top), deadline=deadline, parser=parser
+        )
+        core_top = top + (trim if index > 0 else 0)
+        core_bottom = bottom - (trim if index < len(tiles) - 1 else 0)
+        return [
+            b for b in buttons if core_top <= b["y"] - origin[1] < core_bottom
+        ]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(analyze_tile, index, top, bottom)
+            for index, (top, bottom) in enumerate(tiles)
+        ]
+        buttons = [b for future in futures for b in future.result()]
+
+    return merge_buttons(buttons)
+
+
+def analyze_cards(image, llm, index, origin=(0, 0), **tile_options):
+    """
+    Splits a stitched page into result cards, serves the ones already in
+    `index` (a CardIndex) from it and sends only the unseen ones, stacked into
+    one compact image, to analyze_page(). Returns (buttons, cards_sent) with
+    buttons in screen space; cards_sent is None if no cards were found and
+    the whole page went to analyze_page().
+
+    Segments too short to be cards (headers, pagination) ride along with the
+    unseen cards but aren't indexed. Answers are only written to the index if
+    every tile's response was complete, so a truncated stream can't record
+    "no Connect button" for the cards it didn't reach.
+    """
+    cards, leftovers = split_cards(image)
+    if not cards:
+        logger.warning("No result cards found on the page, analyzing it whole.")
+        return analyze_page(image, llm, origin=origin, **tile_options), None
+
+    buttons, misses = [], []
+    for box in cards:
+        left, top = box[:2]
+        crop = crop_rows(image, box)
+        key = card_key(crop)
+        stored = index.get(key)
+        if stored is None:
+            misses.append((left, top, crop, key))
+        else:
+            buttons += [
+                {"x": b["x"] + left + origin[0], "y": b["y"] + top + origin[1]} for b in stored
+            ]
+    logger.info(
+        f"{len(cards) - len(misses)} of {len(cards)} card(s) served from the card index "
+        f"({index.stats()})."
+    )
+    if not misses:
+        if leftovers:
+            logger.info(f"Skipped {len(leftovers)} short segment(s) outside the result cards.")
+        return merge_buttons(buttons), 0
+
+    sent = len(misses)
+    misses += [(box[0], box[1], crop_rows(image, box), None) for box in leftovers]
+    # Stack the unseen cards; stack_tops[i] is where misses[i] starts
+    stack_tops = []
+    height = 0
+    for _, _, crop, _ in misses:
+        stack_tops.append(height)
+        height += crop.height + CARD_GAP
+    width = max(crop.width for _, _, crop, _ in misses)
+    stack = Image.new("RGB", (width, height - CARD_GAP), "white")
+    for stack_top, (_, _, crop, _) in zip(stack_tops, misses):
+        stack.paste(crop, (0, stack_top))
+
+    found = [[] for _ in misses]
+    parsers = []
+    for button in analyze_page(stack, llm, parsers=parsers, **tile_options):
+        for position, (stack_top, (left, top, crop, _)) in enumerate(zip(stack_tops, misses)):
+            if stack_top <= button["y"] < stack_top + crop.height:
+                found[position].append({"x": button["x"], "y": button["y"] - stack_top})
+                buttons.append(
+                    {
+                        "x": button["x"] + left + origin[0],
+                        "y": button["y"] - stack_top + top + origin[1],
+                    }
+                )
+                break
+    if all(parser.closed for parser in parsers):
+        index.put_many(
+            {
+                key: card_buttons
+                for (_, _, _, key), card_buttons in zip(misses, found)
+                if key is not None
+            }
+        )
+    else:
+        logger.warning("Incomplete LLM answer; not adding these cards to the card index.")
+    return merge_buttons(buttons), sent
+
+
+def detect_page(image, llm, origin=(0, 0), detector=None, card_index=None, **tile_options):
+    """
+    Returns (buttons, source) for a stitched page, where source is "local" if
+    the local detector was confident enough, "index" if every result card was
+    already in `card_index`, and "llm" otherwise.
+    """
+    start = time.perf_counter()
+    if detector is not None:
+        result = detector.detect(image)
+        if result.confidence >= LOCAL_CONFIDENCE_THRESHOLD:
+            buttons = [
+                {"x": b["x"] + origin[0], "y": b["y"] + origin[1]} for b in result.buttons
+            ]
+            logger.info(
+                f"Page answered locally in {time.perf_counter() - start:.2f}s "
+                f"(confidence {result.confidence:.2f})."
+            )
+            return buttons, "local"
+        logger.info(
+            f"Local confidence {result.confidence:.2f} below "
+            f"{LOCAL_CONFIDENCE_THRESHOLD}, escalating to the LLM."
+        )
+
+    if card_index is not None:
+        buttons, sent = analyze_cards(image, llm, card_index, origin=origin, **tile_options)
+        if sent == 0:
+            logger.info(f"Page answered from the card index in {time.perf_counter() - start:.2f}s.")
+            return buttons, "index"
+    else:
+        buttons = analyze_page(image, llm, origin=origin, **tile_options)
+    logger.info(f"Page answered by the LLM in {time.perf_counter() - start:.2f}s.")
+    return buttons, "llm"